@@ -243,7 +243,7 @@ class WaylandVSync:
         print("\n실제 VSync 테스트 시작 - xdg-shell configure 대기")
         print("(프레임 콜백만 사용, 시뮬레이션 절대 없음)")
         
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()
         self.frame_count = 0
         self.frame_times = []
         
@@ -268,7 +268,7 @@ class WaylandVSync:
                     break
                 
                 # configure 없이 너무 오래 대기
-                elapsed = time.time() - self.start_time
+                elapsed = time.perf_counter() - self.start_time
                 if not self.configured and elapsed > configure_timeout:
                     print(f"{configure_timeout}초간 configure 없음 - xdg-shell 문제")
                     break
@@ -286,7 +286,7 @@ class WaylandVSync:
     
     def _print_results(self):
         """결과 출력"""
-        elapsed = time.time() - self.start_time
+        elapsed = time.perf_counter() - self.start_time
         
         print(f"\n=== 실제 VSync 테스트 결과 ===")
         print(f"총 프레임: {self.frame_count}")
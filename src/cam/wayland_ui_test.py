@@ -116,7 +116,7 @@ class SimpleUITest(QMainWindow):
             # Start VSync synchronization
             self.vsync_timer.start()
             
-            self.start_time = time.time()
+            self.start_time = time.perf_counter()
             
         except Exception as e:
             print(f"❌ VSync timer setup failed: {e}")
@@ -143,7 +143,7 @@ class SimpleUITest(QMainWindow):
     
     def on_frame_signal(self, frame_number):
         """VSync frame signal callback (like ps_camera.py on_frame_signal)"""
-        current_time = time.time()
+        current_time = time.perf_counter()
         
         # Calculate frame interval
         if self.last_frame_time is not None:
@@ -169,7 +169,7 @@ class SimpleUITest(QMainWindow):
     
     def update_frame(self):
         """Fallback frame update for QTimer"""
-        current_time = time.time()
+        current_time = time.perf_counter()
         
         # Calculate frame interval
         if self.last_frame_time is not None:
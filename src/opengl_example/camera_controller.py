@@ -20,6 +20,7 @@ class OpenGLCameraController:
         self.camera_info = {}
         self.target_ip = target_ip
         self.frame_callback = None
+        self.frame_array_callback = None  # BGR ndarray 콜백 (QImage 변환 생략)
         self.frame_number = 0  # 프레임 번호 (카메라 이미지에 표시)
     
     def setup_camera(self):
@@ -85,6 +86,13 @@ class OpenGLCameraController:
         """프레임 콜백 함수 설정"""
         self.frame_callback = callback_func
     
+    def set_frame_array_callback(self, callback_func):
+        """
+        BGR ndarray 프레임 콜백 함수 설정
+        설정되면 QImage 변환 없이 SDK 버퍼를 한 번만 복사해 전달
+        """
+        self.frame_array_callback = callback_func
+    
     @mvsdk.method(mvsdk.CAMERA_SNAP_PROC)
     def grab_callback(self, hCamera, pRawData, pFrameHead, pContext):
         """카메라 콜백 함수 - 새 프레임이 준비되면 자동 호출"""
@@ -108,10 +116,13 @@ class OpenGLCameraController:
             self.frame_number += 1
             height, width = frame.shape[:2]
             
-            # QImage로 변환
-            bytes_per_line = 3 * width
-            frame_contiguous = np.ascontiguousarray(frame)
-            q_image = QImage(frame_contiguous.data, width, height, bytes_per_line, QImage.Format_RGB888).rgbSwapped()
+            # SDK 버퍼는 다음 프레임에서 재사용되므로 연속 메모리로 한 번만 복사
+            if self.frame_array_callback:
+                self.frame_array_callback(frame.copy())
+                return
+            
+            # QImage로 변환 (BGR888로 채널 교환 없이, SDK 버퍼 재사용에 대비해 복사)
+            q_image = QImage(frame.data, width, height, frame.strides[0], QImage.Format_BGR888).copy()
             
             # 등록된 콜백 함수 호출
             if self.frame_callback and not q_image.isNull():
@@ -17,15 +17,16 @@ from PySide6.QtWidgets import (QApplication, QMainWindow, QPushButton, QWidget,
                                 QVBoxLayout, QHBoxLayout, QLabel, QSlider, QSizePolicy, QComboBox)
 from PySide6.QtOpenGL import QOpenGLWindow
 from PySide6.QtGui import QSurfaceFormat, QPainter, QFont, QColor, QPen, QPixmap, QImage
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
 from OpenGL import GL
 
 from opengl_example.camera_controller import OpenGLCameraController
 from _lib import mvsdk
 from _lib.wayland_utils import setup_wayland_environment
 from yolo.inference.model_manager import YOLOEModelManager
-from yolo.inference.engine import InferenceEngine
+from yolo.inference.worker import InferenceWorker
 from ps.yolo_renderer import CustomYOLORenderer
+from ps.tracking_engine import TrackingInferenceEngine
 
 
 # ==================== 전용 Config ====================
@@ -44,6 +45,7 @@ YOLO_CONF = 0.15        # 낮은 신뢰도로 지속 탐지
 YOLO_IOU = 0.5          # 겹침 허용도
 YOLO_MAX_DET = 50      # 최대 탐지 수
 YOLO_IMGSZ = 640        # 입력 이미지 크기
+YOLO_HALF = True        # FP16 추론 (GPU 전용)
 
 # 상수 정의
 BUSY_WAIT_THRESHOLD_MS = 0.001
@@ -65,23 +67,30 @@ class CameraOpenGLWindow(QOpenGLWindow):
         # 프레임 데이터
         self.current_pixmap = None
         self.pending_pixmap = None
+        self.pending_result_bgr = None  # 최신 추론 결과 (그릴 때 한 번만 변환)
         self.current_frame_bgr = None
         self.original_frame_bgr = None  # 호모그래피 적용 전 원본
         self._frame = 0
         self.show_black = True
         
-        # 캐시
+        # 캐시 (새 프레임/리사이즈 시 None으로 무효화)
         self._scaled_cache = None
-        self._cache_key = None
+        self._viewport_size = (0, 0)  # resizeGL에서만 갱신
         
         # UI 스타일
         self._info_font = QFont("Monospace", 8)
         self._info_pen = QPen(QColor(0, 255, 0))
         
-        # YOLO 통계
-        self.last_infer_time = 0.0
-        self.avg_infer_time = 0.0
-        self.detected_count = 0
+        # YOLO 통계 텍스트 (최대 4Hz 갱신, 매 페인트마다 포맷하지 않음)
+        self._yolo_text = "추론: 0.0ms (평균: 0.0ms) | 탐지: 0 | 드롭: 0"
+        self._last_stats_ts = 0.0
+        
+        # 추론 워커 (GUI 스레드 블로킹 방지)
+        self.inference_worker = None
+        if self.inference_engine:
+            self.inference_worker = InferenceWorker(self.inference_engine)
+            self.inference_worker.result_ready.connect(self._on_inference_result)
+            self.inference_worker.request_warmup()  # 워커 시작 + 첫 프레임 전 워밍업 (UI 스레드 블로킹 없음)
         
         # 호모그래피 핸들 (4개 모서리)
         self.homography_enabled = True
@@ -101,6 +110,12 @@ class CameraOpenGLWindow(QOpenGLWindow):
     def resizeGL(self, w, h):
         """윈도우 크기 변경 처리"""
         GL.glViewport(0, 0, w, h)
+        self._viewport_size = (w, h)
+        self._scaled_cache = None
+        
+        # 추론 결과를 워커에서 화면 크기로 리사이즈 (그릴 때 스케일 생략)
+        if self.inference_engine:
+            self.inference_engine.display_size = (w, h)
 
     def paintGL(self):
         """프레임 렌더링 (VSync 동기화)"""
@@ -127,12 +142,10 @@ class CameraOpenGLWindow(QOpenGLWindow):
         painter.end()
     
     def _render_camera_screen(self):
-        """카메라 화면 렌더링 + YOLO 추론"""
+        """카메라 화면 렌더링 (YOLO 결과는 워커에서 전달)"""
         # 대기 중인 프레임 처리
         self._update_pending_frame()
-        
-        # YOLO 추론 수행
-        display_pixmap = self._perform_yolo_inference()
+        display_pixmap = self.current_pixmap
         
         # 화면 그리기
         painter = QPainter(self)
@@ -153,79 +166,69 @@ class CameraOpenGLWindow(QOpenGLWindow):
         painter.drawText(10, 15, info_text)
         
         if self.inference_engine:
-            yolo_text = f"추론: {self.last_infer_time:.1f}ms (평균: {self.avg_infer_time:.1f}ms) | 탐지: {self.detected_count}"
-            painter.drawText(10, 30, yolo_text)
+            painter.drawText(10, 30, self._yolo_text)
         
         painter.end()
     
     def _update_pending_frame(self):
         """대기 중인 프레임 업데이트"""
+        # VSync 사이에 도착한 추론 결과 중 최신 결과만 변환
+        if self.pending_result_bgr is not None:
+            display_bgr, self.pending_result_bgr = self.pending_result_bgr, None
+            self.pending_pixmap = self.inference_engine.to_pixmap(display_bgr)
+        
         if self.pending_pixmap is not None:
             self.current_pixmap = self.pending_pixmap
             self.pending_pixmap = None
-            self._cache_key = None
-    
-    def _perform_yolo_inference(self):
-        """YOLO 추론 수행 (ByteTrack 추적)"""
-        if not (self.current_frame_bgr is not None and self.inference_engine and self.yolo_renderer):
-            return self.current_pixmap
-        
-        try:
-            start_time = time.time()
-            
-            # 추론 실행 (설정 + ByteTrack)
-            results = self.inference_engine.model.track(
-                self.current_frame_bgr,
-                persist=True,
-                **self.inference_engine.config.to_dict()
-            )
-            
-            infer_time = (time.time() - start_time) * 1000
-            
-            # 결과 처리
-            result = self._extract_result(results)
-            
-            # 렌더링
-            q_image = self.yolo_renderer.render(self.current_frame_bgr, result)
-            
-            # 통계 업데이트
-            self._update_yolo_stats(infer_time, result)
-            
-            return QPixmap.fromImage(q_image)
-        except Exception as e:
-            print(f"❌ YOLO 추론 실패: {e}")
-            return self.current_pixmap
-    
-    def _extract_result(self, results):
-        """추론 결과 추출"""
-        if self.inference_engine.is_engine:
-            return results if not isinstance(results, list) else results[0]
-        return results[0] if isinstance(results, list) else results
-    
-    def _update_yolo_stats(self, infer_time, result):
-        """YOLO 통계 업데이트"""
-        self.last_infer_time = infer_time
-        self.inference_engine._update_infer_stats(infer_time)
-        self.avg_infer_time = self.inference_engine.avg_infer_time
-        self.detected_count = len(result.boxes) if hasattr(result, 'boxes') else 0
+            self._scaled_cache = None
+    
+    def _on_inference_result(self, display_bgr, stats):
+        """워커 추론 결과 수신 (메인 스레드, 이전 미표시 결과는 덮어써서 버림)"""
+        self.pending_result_bgr = display_bgr
+        
+        # 통계 텍스트는 250ms마다만 갱신 (사람이 읽을 수 있는 속도)
+        now = time.monotonic()
+        if now - self._last_stats_ts >= 0.25:
+            self._last_stats_ts = now
+            self._yolo_text = (f"추론: {stats['infer_time']:.1f}ms "
+                               f"(평균: {stats['avg_infer_time']:.1f}ms) | "
+                               f"탐지: {stats['detected_count']} | "
+                               f"드롭: {stats['dropped']}")
+    
+    def _submit_inference_frame(self, frame_bgr):
+        """추론 워커에 프레임 제출 (워커가 없으면 False)"""
+        if self.inference_worker is None or frame_bgr is None:
+            return False
+        self.inference_worker.submit_frame(frame_bgr)
+        return True
+    
+    def stop_inference(self):
+        """추론 워커 중지"""
+        if self.inference_worker:
+            self.inference_worker.stop()
+            self.inference_worker = None
     
     def _draw_scaled_pixmap(self, painter, pixmap):
         """스케일된 이미지 그리기"""
-        w, h = self.width(), self.height()
-        key = (pixmap.cacheKey(), w, h)
+        w, h = self._viewport_size
         
-        if key != self._cache_key:
-            self._scaled_cache = pixmap.scaled(w, h, Qt.KeepAspectRatio, Qt.FastTransformation)
-            self._cache_key = key
+        # 캐시는 새 프레임 또는 리사이즈 시에만 무효화됨
+        if self._scaled_cache is None:
+            # 워커에서 이미 화면 크기로 리사이즈된 프레임은 그대로 사용
+            if pixmap.size().scaled(w, h, Qt.KeepAspectRatio) == pixmap.size():
+                self._scaled_cache = pixmap
+            else:
+                self._scaled_cache = pixmap.scaled(w, h, Qt.KeepAspectRatio, Qt.FastTransformation)
         
         x = (w - self._scaled_cache.width()) // 2
         y = (h - self._scaled_cache.height()) // 2
         painter.drawPixmap(x, y, self._scaled_cache)
 
-    def update_camera_frame(self, q_image, frame_bgr=None):
-        """카메라 프레임 업데이트"""
-        if q_image is None or q_image.isNull():
+    def update_camera_frame(self, frame_bgr):
+        """카메라 프레임 업데이트 (BGR ndarray)"""
+        if frame_bgr is None:
             self.pending_pixmap = None
+            self.pending_result_bgr = None
             self.current_frame_bgr = None
             self.original_frame_bgr = None
         else:
@@ -233,18 +236,22 @@ class CameraOpenGLWindow(QOpenGLWindow):
             self.original_frame_bgr = frame_bgr
             
             # 호모그래피 핸들 초기화 (첫 프레임)
-            if self.homography_handles is None and frame_bgr is not None:
+            if self.homography_handles is None:
                 self._init_homography_handles(frame_bgr.shape[1], frame_bgr.shape[0])
             
             # 호모그래피 변환 적용
-            if self.homography_enabled and frame_bgr is not None:
+            if self.homography_enabled:
                 transformed_bgr = self._apply_homography(frame_bgr)
-                transformed_q_image = self._bgr_to_qimage(transformed_bgr)
-                self.pending_pixmap = QPixmap.fromImage(transformed_q_image)
                 self.current_frame_bgr = transformed_bgr
+                
+                # 추론 결과가 화면을 갱신하므로 원본 표시는 생략
+                if not self._submit_inference_frame(transformed_bgr):
+                    transformed_q_image = self._bgr_to_qimage(transformed_bgr)
+                    self.pending_pixmap = QPixmap.fromImage(transformed_q_image)
             else:
-                self.pending_pixmap = QPixmap.fromImage(q_image)
                 self.current_frame_bgr = frame_bgr
+                if not self._submit_inference_frame(frame_bgr):
+                    self.pending_pixmap = QPixmap.fromImage(self._bgr_to_qimage(frame_bgr))
     
     def _init_homography_handles(self, width, height):
         """호모그래피 핸들 초기화 (이미지 크기 기준)"""
@@ -299,10 +306,9 @@ class CameraOpenGLWindow(QOpenGLWindow):
         return warped
     
     def _bgr_to_qimage(self, frame_bgr):
-        """BGR 프레임을 QImage로 변환"""
+        """BGR 프레임을 QImage로 변환 (BGR888 뷰, 색 변환 없음)"""
         h, w = frame_bgr.shape[:2]
-        rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
-        return QImage(rgb.data, w, h, w * 3, QImage.Format_RGB888)
+        return QImage(frame_bgr.data, w, h, frame_bgr.strides[0], QImage.Format_BGR888)
     
     def _draw_homography_handles(self, painter):
         """호모그래피 핸들 그리기"""
@@ -337,7 +343,7 @@ class CameraOpenGLWindow(QOpenGLWindow):
             return image_points
         
         img_h, img_w = self.original_frame_bgr.shape[:2]
-        screen_w, screen_h = self.width(), self.height()
+        screen_w, screen_h = self._viewport_size
         
         # 종횡비 유지하며 스케일 계산
         scale = min(screen_w / img_w, screen_h / img_h)
@@ -363,7 +369,7 @@ class CameraOpenGLWindow(QOpenGLWindow):
             return screen_x, screen_y
         
         img_h, img_w = self.original_frame_bgr.shape[:2]
-        screen_w, screen_h = self.width(), self.height()
+        screen_w, screen_h = self._viewport_size
         
         # 종횡비 유지하며 스케일 계산
         scale = min(screen_w / img_w, screen_h / img_h)
@@ -417,9 +423,10 @@ class CameraOpenGLWindow(QOpenGLWindow):
             if self.original_frame_bgr is not None:
                 transformed_bgr = self._apply_homography(self.original_frame_bgr)
                 self.current_frame_bgr = transformed_bgr
-                transformed_q_image = self._bgr_to_qimage(transformed_bgr)
-                self.current_pixmap = QPixmap.fromImage(transformed_q_image)
-                self._cache_key = None
+                if not self._submit_inference_frame(transformed_bgr):
+                    transformed_q_image = self._bgr_to_qimage(transformed_bgr)
+                    self.current_pixmap = QPixmap.fromImage(transformed_q_image)
+                    self._scaled_cache = None
             
             event.accept()
             return
@@ -504,6 +511,7 @@ class MainWindow(QMainWindow):
     DEFAULT_WINDOW_SIZE = (1024, 768)
     CONTROL_PANEL_HEIGHT = 100
     BUTTON_WIDTH = 150
+    CAMERA_APPLY_DELAY_MS = 50  # 슬라이더 드래그 중 카메라 설정 반영 지연
     
     def __init__(self):
         super().__init__()
@@ -512,6 +520,13 @@ class MainWindow(QMainWindow):
         self.exposure_time_ms = self.DEFAULT_EXPOSURE_MS
         self.vsync_delay_ms = self.DEFAULT_VSYNC_DELAY_MS
         
+        # 슬라이더 값은 드래그가 멈춘 뒤 한 번만 카메라에 반영 (SDK 호출 디바운스)
+        self._pending_camera_settings = {}
+        self._camera_apply_timer = QTimer(self)
+        self._camera_apply_timer.setSingleShot(True)
+        self._camera_apply_timer.setInterval(self.CAMERA_APPLY_DELAY_MS)
+        self._camera_apply_timer.timeout.connect(self._apply_camera_settings)
+        
         self.setWindowTitle("OpenGL Camera - YOLOE")
         
         # YOLO 초기화
@@ -581,19 +596,21 @@ class MainWindow(QMainWindow):
                         'iou': YOLO_IOU,
                         'max_det': YOLO_MAX_DET,
                         'imgsz': YOLO_IMGSZ,
+                        'half': YOLO_HALF,
                         'verbose': False
                     }
             
-            # 추론 엔진
-            inference_engine = InferenceEngine(
+            # 렌더러
+            yolo_renderer = CustomYOLORenderer(model)
+            
+            # 추론 엔진 (ByteTrack + 커스텀 렌더러, 워커 스레드에서 실행)
+            inference_engine = TrackingInferenceEngine(
                 model,
                 model_list[0][1] if model_list else None,
-                YOLOConfig()
+                YOLOConfig(),
+                yolo_renderer
             )
             
-            # 렌더러
-            yolo_renderer = CustomYOLORenderer(model)
-            
             print(f"✅ YOLOE 모델 로드: {Path(model_list[0][1]).name}")
             print(f"✅ 프롬프트: {', '.join(YOLO_PROMPTS)}")
             print(f"✅ ByteTrack (conf={YOLO_CONF}, iou={YOLO_IOU}, ID 일관성 우선)")
@@ -689,7 +706,8 @@ class MainWindow(QMainWindow):
             print(f"❌ 카메라 초기화 실패: {message}")
             return
         
-        self.camera.set_frame_callback(self.on_new_camera_frame)
+        # QImage 왕복 변환 없이 BGR 프레임을 직접 받음
+        self.camera.set_frame_array_callback(self.on_new_camera_frame)
         
         # 초기 설정
         gain_value = self.camera.get_gain()
@@ -706,21 +724,10 @@ class MainWindow(QMainWindow):
         print(f"✅ 카메라 연결 성공: {self.camera.camera_info['name']}")
         print(f"🎬 초기 셔터 트리거 발생")
 
-    def on_new_camera_frame(self, q_image):
-        """카메라 프레임 콜백"""
-        if q_image and not q_image.isNull():
-            frame_bgr = self._qimage_to_bgr(q_image)
-            self.opengl_window.update_camera_frame(q_image, frame_bgr)
-    
-    def _qimage_to_bgr(self, q_image):
-        """QImage를 BGR로 변환"""
-        try:
-            width, height = q_image.width(), q_image.height()
-            arr = np.array(q_image.bits()).reshape(height, width, 3)
-            return cv2.cvtColor(arr, cv2.COLOR_RGB2BGR)
-        except Exception as e:
-            print(f"⚠️ QImage to BGR 변환 실패: {e}")
-            return None
+    def on_new_camera_frame(self, frame_bgr):
+        """카메라 프레임 콜백 (SDK 스레드, 추론은 워커로 전달)"""
+        # 이미 연속 배열이면 ascontiguousarray가 복사 없이 그대로 반환
+        self.opengl_window.update_camera_frame(np.ascontiguousarray(frame_bgr))
 
     def on_bbox_toggle(self):
         """바운딩 박스 토글"""
@@ -728,7 +735,7 @@ class MainWindow(QMainWindow):
             self.yolo_renderer.draw_boxes = not self.yolo_renderer.draw_boxes
             status = "ON" if self.yolo_renderer.draw_boxes else "OFF"
             self.bbox_btn.setText(f"바운딩 박스: {status}")
-            self.opengl_window._cache_key = None
+            self.opengl_window._scaled_cache = None
             print(f"{'✅' if self.yolo_renderer.draw_boxes else '❌'} 바운딩 박스")
     
     def on_camera_feed_toggle(self):
@@ -737,7 +744,7 @@ class MainWindow(QMainWindow):
             self.yolo_renderer.draw_camera_feed = not self.yolo_renderer.draw_camera_feed
             status = "ON" if self.yolo_renderer.draw_camera_feed else "OFF"
             self.camera_feed_btn.setText(f"촬영화면: {status}")
-            self.opengl_window._cache_key = None
+            self.opengl_window._scaled_cache = None
             print(f"{'✅' if self.yolo_renderer.draw_camera_feed else '❌'} 촬영화면")
     
     def on_handle_toggle(self):
@@ -771,25 +778,40 @@ class MainWindow(QMainWindow):
         # 렌더러 업데이트
         self.yolo_renderer.model = new_model
         
+        # 워밍업은 워커 스레드에서 (다음 프레임보다 먼저 처리되어 추론과 겹치지 않음)
+        if self.opengl_window.inference_worker:
+            self.opengl_window.inference_worker.request_warmup()
+        
         # 캐시 초기화
-        self.opengl_window._cache_key = None
+        self.opengl_window._scaled_cache = None
         
         print(f"✅ 모델 변경: {Path(model_path).name}")
         print(f"✅ 프롬프트: {', '.join(YOLO_PROMPTS)}")
     
     def on_gain_change(self, value):
-        """게인 변경"""
-        if self.camera:
-            self.camera.set_gain(value)
+        """게인 변경 (라벨은 즉시, 카메라는 디바운스 후 반영)"""
+        self._pending_camera_settings['gain'] = value
+        self._camera_apply_timer.start()
         self.gain_label.setText(str(int(value)))
 
     def on_exposure_change(self, value):
-        """노출시간 변경"""
+        """노출시간 변경 (라벨은 즉시, 카메라는 디바운스 후 반영)"""
         self.exposure_time_ms = value
-        if self.camera:
-            self.camera.set_exposure_time(value * 1000)
+        self._pending_camera_settings['exposure'] = value
+        self._camera_apply_timer.start()
         self.노출시간_label.setText(f"{value}ms")
     
+    def _apply_camera_settings(self):
+        """대기 중인 게인/노출시간을 카메라에 반영 (마지막 값만)"""
+        settings, self._pending_camera_settings = self._pending_camera_settings, {}
+        if not self.camera:
+            return
+        
+        if 'gain' in settings:
+            self.camera.set_gain(settings['gain'])
+        if 'exposure' in settings:
+            self.camera.set_exposure_time(settings['exposure'] * 1000)
+    
     def on_delay_change(self, value):
         """셔터 딜레이 변경"""
         self.vsync_delay_ms = value
@@ -828,6 +850,8 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event):
         """윈도우 종료 시 정리"""
+        self._camera_apply_timer.stop()
+        self.opengl_window.stop_inference()
         if self.camera:
             self.camera.cleanup()
         event.accept()
@@ -0,0 +1,57 @@
+#coding=utf-8
+"""
+추적 추론 엔진
+ByteTrack 추적 + 커스텀 렌더러 시각화 (InferenceWorker에서 실행)
+"""
+import time
+from yolo.inference.engine import InferenceEngine
+
+
+class TrackingInferenceEngine(InferenceEngine):
+    """ByteTrack 추적 및 커스텀 렌더링 추론 엔진"""
+    
+    def __init__(self, model, model_path=None, config=None, renderer=None):
+        """
+        Args:
+            model: YOLO 모델 객체
+            model_path: 모델 파일 경로
+            config: to_dict()를 제공하는 추론 설정 객체
+            renderer: CustomYOLORenderer 객체
+        """
+        super().__init__(model, model_path, config)
+        self.renderer = renderer
+    
+    def process_frame(self, frame_bgr):
+        """
+        프레임 추적 및 커스텀 시각화
+        
+        Args:
+            frame_bgr: BGR 포맷의 입력 프레임
+        
+        Returns:
+            (display_bgr, stats): 화면 크기로 리사이즈된 시각화 BGR 프레임과 통계 딕셔너리
+        """
+        # 추론 실행 (설정 + ByteTrack)
+        start_time = time.perf_counter()
+        results = self.model.track(frame_bgr, persist=True, **self.config.to_dict())
+        end_time = time.perf_counter()
+        infer_time = (end_time - start_time) * 1000
+        
+        self._update_infer_stats(infer_time)
+        self._update_fps(end_time)
+        
+        # 결과 처리 및 렌더링 (화면 크기 리사이즈까지 워커에서 수행)
+        result = results[0] if isinstance(results, list) else results
+        display_bgr = self._resize_for_display(self.renderer.render(frame_bgr, result))
+        detected_count = len(result.boxes) if hasattr(result, 'boxes') else 0
+        
+        stats = {
+            'fps': self.current_fps,
+            'infer_time': self.last_infer_time,
+            'avg_infer_time': self.avg_infer_time,
+            'detected_count': detected_count,
+            'frame_width': frame_bgr.shape[1],
+            'frame_height': frame_bgr.shape[0]
+        }
+        
+        return display_bgr, stats
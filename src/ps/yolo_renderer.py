@@ -5,7 +5,6 @@
 """
 import cv2
 import numpy as np
-from PySide6.QtGui import QImage
 
 
 class CustomYOLORenderer:
@@ -19,6 +18,7 @@ class CustomYOLORenderer:
         self.model = model
         self.draw_boxes = True  # 바운딩 박스/라벨 표시 여부
         self.draw_camera_feed = True  # 촬영화면 표시 여부
+        self._class_colors = {}  # 클래스별 색상 캐시
     
     def render(self, frame_bgr, result):
         """
@@ -29,16 +29,14 @@ class CustomYOLORenderer:
             result: YOLO 추론 결과
         
         Returns:
-            QImage: 시각화된 QImage
+            시각화된 BGR 프레임 (QPixmap 변환은 UI 스레드에서 수행)
         """
         if not hasattr(result, 'boxes') or len(result.boxes) == 0:
             # 탐지 결과 없으면 원본 또는 검은 배경 반환
             if self.draw_camera_feed:
-                frame_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
-            else:
-                # 검은 배경
-                frame_rgb = np.zeros_like(frame_bgr)
-            return self._numpy_to_qimage(frame_rgb)
+                return frame_bgr
+            # 검은 배경
+            return np.zeros_like(frame_bgr)
         
         # 촬영화면 또는 검은 배경
         if self.draw_camera_feed:
@@ -47,17 +45,29 @@ class CustomYOLORenderer:
             # 검은 배경 생성
             annotated = np.zeros_like(frame_bgr)
         
+        # 탐지 결과를 한 번에 CPU numpy로 변환 (박스별 텐서 동기화 제거)
+        boxes = result.boxes
+        xyxy = boxes.xyxy.cpu().numpy().astype(np.int32)
+        classes = boxes.cls.cpu().numpy().astype(np.int32)
+        confs = boxes.conf.cpu().numpy()
+        track_ids = boxes.id.cpu().numpy().astype(np.int32) if boxes.id is not None else None
+        
+        # 중앙 도형 좌표/크기 (벡터 연산)
+        centers = (xyxy[:, :2] + xyxy[:, 2:]) // 2
+        sizes = np.minimum(xyxy[:, 2] - xyxy[:, 0], xyxy[:, 3] - xyxy[:, 1]) // 3
+        names = self.model.names if hasattr(self.model, 'names') else None
+        
         # 각 탐지 결과 그리기
-        for box in result.boxes:
-            x1, y1, x2, y2 = map(int, box.xyxy[0].cpu().numpy())
-            conf = float(box.conf[0])
-            cls = int(box.cls[0])
+        for i in range(len(xyxy)):
+            x1, y1, x2, y2 = xyxy[i].tolist()
+            conf = float(confs[i])
+            cls = int(classes[i])
             
             # Tracking ID (ByteTrack)
-            track_id = int(box.id[0]) if hasattr(box, 'id') and box.id is not None else None
+            track_id = int(track_ids[i]) if track_ids is not None else None
             
             # 클래스명 및 색상
-            class_name = self.model.names[cls] if hasattr(self.model, 'names') else f"class_{cls}"
+            class_name = names[cls] if names is not None else f"class_{cls}"
             color = self._get_class_color(cls)
             
             # 바운딩 박스 및 라벨 (옵션)
@@ -75,22 +85,21 @@ class CustomYOLORenderer:
                 cv2.putText(annotated, label, (x1, y1 - 2), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
             
             # 중앙 도형 (항상 표시)
-            cx = (x1 + x2) // 2
-            cy = (y1 + y2) // 2
-            size = min(x2 - x1, y2 - y1) // 3
-            self._draw_shape(annotated, cls, cx, cy, size, color)
+            cx, cy = centers[i].tolist()
+            self._draw_shape(annotated, cls, cx, cy, int(sizes[i]), color)
         
-        # BGR → RGB → QImage
-        frame_rgb = cv2.cvtColor(annotated, cv2.COLOR_BGR2RGB)
-        return self._numpy_to_qimage(frame_rgb)
+        return annotated
     
-    @staticmethod
-    def _get_class_color(cls):
-        """클래스별 고유 색상 (HSV 기반)"""
-        hue = (cls * 47) % 180
-        hsv = np.uint8([[[hue, 255, 255]]])
-        bgr = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)[0][0]
-        return tuple(map(int, bgr))
+    def _get_class_color(self, cls):
+        """클래스별 고유 색상 (HSV 기반, 클래스당 한 번만 계산)"""
+        color = self._class_colors.get(cls)
+        if color is None:
+            hue = (cls * 47) % 180
+            hsv = np.uint8([[[hue, 255, 255]]])
+            bgr = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)[0][0]
+            color = tuple(map(int, bgr))
+            self._class_colors[cls] = color
+        return color
     
     @staticmethod
     def _draw_shape(frame, cls, cx, cy, size, color):
@@ -108,11 +117,4 @@ class CustomYOLORenderer:
             cv2.fillPoly(frame, [pts], color)
         else:  # 사각형
             cv2.rectangle(frame, (cx - size, cy - size), (cx + size, cy + size), color, -1)
-    
-    @staticmethod
-    def _numpy_to_qimage(frame_rgb):
-        """numpy 배열을 QImage로 변환"""
-        height, width, channel = frame_rgb.shape
-        bytes_per_line = 3 * width
-        return QImage(frame_rgb.data, width, height, bytes_per_line, QImage.Format_RGB888).copy()
 
@@ -27,6 +27,7 @@ class CameraController:
         
         # 폴링 스레드
         self.polling_thread = None
+        self._frame_interval = 0.0  # 프레임 수신 간격 EMA (초)
         
         # 시그널
         self.signals = CameraSignals()
@@ -101,9 +102,15 @@ class CameraController:
         mvsdk.CameraPlay(self.hCamera)
         print(f"✅ 해상도: {resolution_desc.iWidth}x{resolution_desc.iHeight}")
     
+    @property
+    def frame_rate(self):
+        """측정된 카메라 프레임 속도 (폴링 시작 후 2프레임 전까지는 0)"""
+        return 1.0 / self._frame_interval if self._frame_interval > 0 else 0.0
+    
     def start_trigger(self, target_fps=None):
         """폴링 시작 (최대 속도)"""
         self.is_running = True
+        self._frame_interval = 0.0
         self.polling_thread = threading.Thread(target=self._polling_loop, daemon=True)
         self.polling_thread.start()
     
@@ -118,6 +125,7 @@ class CameraController:
     
     def _polling_loop(self):
         """폴링 루프 (최대 속도)"""
+        last_time = None
         while self.is_running and self.hCamera:
             try:
                 # 프레임 획득 대기 (타임아웃 1초)
@@ -127,18 +135,27 @@ class CameraController:
                 mvsdk.CameraImageProcess(self.hCamera, pRawData, 
                                         self.pFrameBuffer, pFrameHead)
                 
-                # numpy 배열로 변환
+                # numpy 뷰로 변환 (프레임 버퍼를 복사하지 않음)
                 frame_data = (mvsdk.c_ubyte * pFrameHead.uBytes).from_address(self.pFrameBuffer)
-                frame = np.frombuffer(frame_data, dtype=np.uint8).copy()
+                frame = np.frombuffer(frame_data, dtype=np.uint8)
                 frame = frame.reshape((pFrameHead.iHeight, pFrameHead.iWidth, 3))
                 
                 # 버퍼 해제
                 mvsdk.CameraReleaseImageBuffer(self.hCamera, pRawData)
                 
                 # BGR로 변환 후 시그널 발생
+                # cvtColor 출력이 새 배열이므로 재사용되는 프레임 버퍼와 분리됨 (별도 copy 불필요)
                 frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
                 self.signals.frame_ready.emit(frame_bgr)
                 
+                # 프레임 속도 측정 (경량 모델 전환 기준)
+                now = time.perf_counter()
+                if last_time is not None:
+                    interval = now - last_time
+                    self._frame_interval = (interval if self._frame_interval == 0
+                                            else self._frame_interval * 0.9 + interval * 0.1)
+                last_time = now
+                
             except mvsdk.CameraException as e:
                 if self.is_running:
                     print(f"⚠️ 프레임 획득 실패: {e}")
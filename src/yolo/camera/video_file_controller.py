@@ -5,13 +5,12 @@
 """
 import time
 import cv2
-import numpy as np
 from PySide6.QtCore import QObject, Signal, QTimer
 
 
 class VideoSignals(QObject):
     """비디오 시그널"""
-    frame_ready = Signal(np.ndarray)  # BGR 프레임
+    frame_ready = Signal(object)  # BGR 프레임 (batch_size > 1이면 프레임 리스트)
     progress_updated = Signal(int, int, float)  # (current_frame, total_frames, time_sec)
 
 
@@ -24,6 +23,7 @@ class VideoFileController:
         self.is_running = False
         self.target_fps = 30
         self.loop = True
+        self.batch_size = 1  # 타이머 1회당 읽을 연속 프레임 수 (배치 추론용)
         
         # 시그널
         self.signals = VideoSignals()
@@ -67,7 +67,7 @@ class VideoFileController:
     def start_trigger(self, target_fps):
         """재생 시작"""
         self.target_fps = target_fps
-        interval_ms = int(1000 / self.target_fps)
+        interval_ms = int(1000 * self.batch_size / self.target_fps)
         self.timer.start(interval_ms)
         print(f"✅ 비디오 재생 시작 ({target_fps} FPS, interval={interval_ms}ms)")
     
@@ -76,7 +76,7 @@ class VideoFileController:
         if not self.timer.isActive():
             return
         
-        interval_ms = int(1000 / self.target_fps)
+        interval_ms = int(1000 * self.batch_size / self.target_fps)
         self.timer.stop()
         self.timer.start(interval_ms)
         print(f"⏩ 타이머 간격 업데이트: {interval_ms}ms")
@@ -90,32 +90,37 @@ class VideoFileController:
             QCoreApplication.processEvents()
     
     def _read_frame(self):
-        """프레임 읽기 (타이머 콜백)"""
+        """프레임 읽기 (타이머 콜백, batch_size > 1이면 연속 프레임을 리스트로 발생)"""
         if not self.is_running or not self.cap:
             return
         
         try:
-            ret, frame = self.cap.read()
-            
-            if not ret:
-                if self.loop:
-                    # 루프 - 처음으로 되감기
-                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                    ret, frame = self.cap.read()
-                else:
-                    # 루프 없음 - 정지
-                    self.is_running = False
-                    self.stop_trigger()
-                    return
+            frames = []
+            while len(frames) < self.batch_size:
+                ret, frame = self.cap.read()
+                
+                if not ret:
+                    if self.loop:
+                        # 루프 - 처음으로 되감기
+                        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        ret, frame = self.cap.read()
+                    else:
+                        # 루프 없음 - 정지
+                        self.is_running = False
+                        self.stop_trigger()
+                
+                if not ret:
+                    break
+                frames.append(frame)
             
-            if ret:
-                self.current_frame = frame
+            if frames:
+                self.current_frame = frames[-1]
                 # 진행률 업데이트
                 current_pos = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
                 time_sec = current_pos / self.video_fps if self.video_fps > 0 else 0
                 self.signals.progress_updated.emit(current_pos, self.total_frames, time_sec)
                 # 프레임 발생
-                self.signals.frame_ready.emit(frame)
+                self.signals.frame_ready.emit(frames[0] if self.batch_size == 1 else frames)
                 
         except Exception as e:
             print(f"⚠️ 프레임 읽기 오류: {e}")
@@ -0,0 +1,102 @@
+#coding=utf-8
+"""
+탐지 박스 렌더러
+박스만 있는 탐지 결과를 Results.plot() 없이 OpenCV로 직접 그림
+(마스크/키포인트/OBB/분류 결과는 plot() 사용)
+"""
+import cv2
+import numpy as np
+
+
+class BoxAnnotator:
+    """탐지 박스 경량 렌더러 (ultralytics 기본 팔레트/라벨 형식 유지)"""
+    
+    FONT = cv2.FONT_HERSHEY_SIMPLEX
+    TEXT_COLOR = (255, 255, 255)
+    
+    def __init__(self):
+        self._palette = None  # 클래스별 BGR 색상 (첫 렌더링 시 생성)
+    
+    @staticmethod
+    def supports(result):
+        """박스만 있는 탐지 결과인지 확인"""
+        return (getattr(result, 'boxes', None) is not None
+                and getattr(result, 'masks', None) is None
+                and getattr(result, 'keypoints', None) is None
+                and getattr(result, 'obb', None) is None
+                and getattr(result, 'probs', None) is None)
+    
+    def annotate(self, frame_bgr, result):
+        """
+        탐지 박스와 라벨 그리기
+        
+        Args:
+            frame_bgr: 추론에 사용한 BGR 원본 프레임 (수정하지 않음)
+            result: 탐지 결과 (boxes 속성 필요)
+        
+        Returns:
+            박스가 그려진 BGR 프레임
+        """
+        annotated = frame_bgr.copy()
+        self.draw(annotated, result)
+        return annotated
+    
+    def draw(self, canvas, result, scale=1.0):
+        """
+        캔버스에 탐지 박스와 라벨을 직접 그리기 (복사 없음)
+        리사이즈된 디스플레이 프레임에 그릴 때는 박스 좌표만 scale로 변환
+        
+        Args:
+            canvas: 그릴 BGR 프레임 (제자리 수정)
+            result: 탐지 결과 (boxes 속성 필요)
+            scale: 원본 프레임 대비 캔버스 배율
+        """
+        boxes = result.boxes
+        if len(boxes) == 0:
+            return
+        
+        if self._palette is None:
+            self._palette = self._build_palette()
+        
+        # 탐지 결과를 한 번에 CPU numpy로 변환 (박스별 텐서 동기화 제거)
+        xyxy = boxes.xyxy.cpu().numpy()
+        if scale != 1.0:
+            xyxy = xyxy * scale
+        xyxy = xyxy.astype(np.int32)
+        classes = boxes.cls.cpu().numpy().astype(np.int32)
+        confs = boxes.conf.cpu().numpy()
+        track_ids = boxes.id.cpu().numpy().astype(np.int32) if boxes.id is not None else None
+        names = result.names
+        
+        # 선 두께/글자 크기 (ultralytics Annotator와 동일 기준)
+        height, width = canvas.shape[:2]
+        line_width = max(round((height + width) / 2 * 0.003), 2)
+        font_scale = line_width / 3
+        font_thickness = max(line_width - 1, 1)
+        
+        for i in range(len(xyxy)):
+            x1, y1, x2, y2 = xyxy[i].tolist()
+            cls = int(classes[i])
+            color = self._palette[cls % len(self._palette)]
+            
+            cv2.rectangle(canvas, (x1, y1), (x2, y2), color, line_width, cv2.LINE_AA)
+            
+            label = f"{names[cls]} {confs[i]:.2f}"
+            if track_ids is not None:
+                label = f"id:{int(track_ids[i])} {label}"
+            
+            # 라벨 배경 (박스 위 공간이 없으면 박스 안쪽)
+            (label_w, label_h), _ = cv2.getTextSize(label, self.FONT, font_scale, font_thickness)
+            outside = y1 >= label_h + 3
+            label_y2 = y1 - label_h - 3 if outside else y1 + label_h + 3
+            text_y = y1 - 2 if outside else y1 + label_h + 2
+            cv2.rectangle(canvas, (x1, y1), (x1 + label_w, label_y2), color, -1, cv2.LINE_AA)
+            cv2.putText(canvas, label, (x1, text_y), self.FONT, font_scale,
+                        self.TEXT_COLOR, font_thickness, cv2.LINE_AA)
+    
+    @staticmethod
+    def _build_palette():
+        """ultralytics 기본 팔레트를 BGR 튜플 리스트로 변환"""
+        from ultralytics.utils.plotting import colors
+        
+        return [colors(i, True) for i in range(colors.n)]
@@ -4,14 +4,19 @@
 YOLO 추론 수행 및 성능 통계 관리
 """
 import time
+from pathlib import Path
 import cv2
+import numpy as np
 from PySide6.QtGui import QImage, QPixmap
-from PySide6.QtCore import Qt
+from .annotator import BoxAnnotator
 
 
 class InferenceEngine:
     """YOLO 추론 및 통계 관리"""
     
+    INFER_EMA_ALPHA = 0.1      # 추론 시간 지수이동평균 가중치
+    FALLBACK_MIN_SAMPLES = 30  # 경량 모델 전환 판단 전 최소 추론 횟수
+    
     def __init__(self, model, model_path=None, config=None):
         """
         Args:
@@ -22,18 +27,106 @@ class InferenceEngine:
         self.model = model
         self.model_path = model_path
         self.is_engine = model_path and model_path.endswith('.engine') if model_path else False
-        self.config = config
-        self.visual_prompt = None  # visual prompt 이미지 경로
+        self._config = config
+        self._half = getattr(config, 'half', None)  # predictor 생성 시점의 FP16 설정
+        self._visual_prompt = None  # visual prompt 이미지 경로
+        
+        # predictor 재사용 (설정/프롬프트/모델 변경 시에만 Model.__call__ 경로 사용)
+        # 설정 버전은 UI 스레드만 증가, predictor 재설정은 워커 스레드의 _predict에서만 수행
+        self._predictor_model = None
+        self._settings_version = 0
+        self._predictor_version = -1
         
         # FPS 계산
-        self.fps_start_time = time.time()
+        self.fps_start_time = time.perf_counter()
         self.fps_frame_count = 0
         self.current_fps = 0.0
         
-        # 추론 시간 통계
-        self.infer_times = []
+        # 추론 시간 통계 (지수이동평균, 샘플 버퍼 없음)
+        self.infer_samples = 0
         self.last_infer_time = 0.0
         self.avg_infer_time = 0.0
+        
+        # 워밍업 입력 크기 (마지막 프레임 기준)
+        self.frame_shape = (640, 640, 3)
+        
+        # 디스플레이 크기 (width, height) - None이면 원본 크기 유지
+        self.display_size = None
+        self.smooth_upscale = False  # True면 확대 시 INTER_LINEAR (일시정지 화면용)
+        
+        # 탐지 박스 렌더러 (박스만 있는 결과는 plot() 대신 사용)
+        self.annotator = BoxAnnotator()
+        
+        # 부하 대응 경량 모델 (UI에서 켠 경우에만, 첫 전환 시점에 워커 스레드에서 로드)
+        self.fallback_enabled = False
+        self.fallback_loader = None
+        self.fallback_model = None
+        self.fallback_path = None
+        self.target_fps = None
+        self.using_fallback = False
+    
+    @property
+    def config(self):
+        """추론 설정 (EngineConfig 또는 PTConfig)"""
+        return self._config
+    
+    @config.setter
+    def config(self, config):
+        """
+        추론 설정 변경 (UI 스레드)
+        추론 중인 predictor는 건드리지 않고 버전만 올림 (재설정은 워커의 _predict에서)
+        """
+        self._config = config
+        self._settings_version += 1
+    
+    @property
+    def visual_prompt(self):
+        """Visual prompt 데이터 (YOLOE)"""
+        return self._visual_prompt
+    
+    @visual_prompt.setter
+    def visual_prompt(self, prompt):
+        """Visual prompt 변경 (predictor가 바뀌므로 워커의 다음 추론에서 재설정)"""
+        self._visual_prompt = prompt
+        self._settings_version += 1
+    
+    def set_fallback_loader(self, loader):
+        """
+        부하 대응 경량 모델 로더 설정 (모델 변경 시 이전 경량 모델 해제)
+        
+        Args:
+            loader: (model, model_path)를 반환하는 함수 (후보가 없으면 (None, None))
+                    _select_model이 처음 전환을 결정할 때 워커 스레드에서 호출
+        """
+        self.fallback_loader = loader
+        self.fallback_model = None
+        self.fallback_path = None
+        self.using_fallback = False
+    
+    def warmup(self, model=None, runs=3):
+        """
+        더미 프레임으로 모델 워밍업 (첫 프레임 지연 제거)
+        CUDA 컨텍스트, cuDNN 튜닝, TensorRT 엔진 초기화를 미리 수행
+        
+        Args:
+            model: 워밍업할 모델 (None이면 현재 모델)
+            runs: 더미 추론 횟수
+        """
+        model = model if model is not None else self.model
+        if model is None:
+            return
+        
+        kwargs = {'verbose': False}
+        if self.config:
+            kwargs.update(self.config.to_dict())
+        
+        dummy = np.zeros(self.frame_shape, dtype=np.uint8)
+        start_time = time.perf_counter()
+        for _ in range(runs):
+            model(dummy, **kwargs)
+        
+        elapsed = (time.perf_counter() - start_time) * 1000
+        print(f"✅ 모델 워밍업: {runs}회 ({elapsed:.0f}ms, {self.frame_shape[1]}x{self.frame_shape[0]})")
     
     def process_frame(self, frame_bgr):
         """
@@ -43,14 +136,102 @@ class InferenceEngine:
             frame_bgr: BGR 포맷의 입력 프레임
         
         Returns:
-            (q_image, stats): 시각화된 QImage와 통계 딕셔너리
+            (display_bgr, stats): 디스플레이 크기의 시각화 BGR 프레임과 통계 딕셔너리
         """
-        # FPS 업데이트
-        self._update_fps()
+        self.frame_shape = frame_bgr.shape
         
         # YOLO 추론
-        start_time = time.time()
+        kwargs = self._build_kwargs()
+        start_time = time.perf_counter()
+        results = self._predict(self._select_model(), frame_bgr, kwargs)
+        end_time = time.perf_counter()
+        infer_time = (end_time - start_time) * 1000
+        
+        # 추론 시간 통계 및 FPS (추론 종료 시각을 FPS 기준 시각으로 재사용)
+        self._update_infer_stats(infer_time)
+        self._update_fps(end_time)
         
+        # 결과 처리
+        if self.is_engine:
+            result = results if not isinstance(results, list) else results[0]
+        else:
+            result = results[0] if isinstance(results, list) else results
+        
+        # 디스플레이 크기로 렌더링 (QImage 변환은 UI 스레드에서 복사 없이 수행)
+        display_bgr = self._render(frame_bgr, result)
+        detected_count = len(result.boxes) if hasattr(result, 'boxes') else 0
+        
+        # 통계
+        stats = {
+            'fps': self.current_fps,
+            'infer_time': self.last_infer_time,
+            'avg_infer_time': self.avg_infer_time,
+            'detected_count': detected_count,
+            'frame_width': frame_bgr.shape[1],
+            'frame_height': frame_bgr.shape[0],
+            'fallback': self.fallback_path if self.using_fallback else None
+        }
+        
+        return display_bgr, stats
+    
+    def process_batch(self, frames):
+        """
+        여러 프레임을 한 번의 forward로 배치 추론 및 시각화
+        커널 실행/디스패치 오버헤드를 배치 내 프레임이 나눠 가짐
+        (TensorRT 엔진은 dynamic batch로 export된 경우에만 가능)
+        
+        Args:
+            frames: BGR 프레임 리스트 (연속 프레임)
+        
+        Returns:
+            (display_frames, stats): 디스플레이 크기 BGR 프레임 리스트와 통계 딕셔너리
+        """
+        self.frame_shape = frames[-1].shape
+        
+        # YOLO 배치 추론 (프레임당 시간으로 환산해 단일 추론과 동일 기준으로 통계)
+        kwargs = self._build_kwargs()
+        start_time = time.perf_counter()
+        results = self._predict(self._select_model(), frames, kwargs)
+        end_time = time.perf_counter()
+        infer_time = (end_time - start_time) * 1000 / len(frames)
+        
+        self._update_infer_stats(infer_time)
+        self._update_fps(end_time, len(frames))
+        
+        # 결과 렌더링
+        display_frames = [self._render(frame, result) for frame, result in zip(frames, results)]
+        last_result = results[-1]
+        detected_count = len(last_result.boxes) if hasattr(last_result, 'boxes') else 0
+        
+        stats = {
+            'fps': self.current_fps,
+            'infer_time': self.last_infer_time,
+            'avg_infer_time': self.avg_infer_time,
+            'detected_count': detected_count,
+            'frame_width': frames[-1].shape[1],
+            'frame_height': frames[-1].shape[0],
+            'fallback': self.fallback_path if self.using_fallback else None
+        }
+        
+        return display_frames, stats
+    
+    def reset_stats(self):
+        """통계 초기화"""
+        self.fps_start_time = time.perf_counter()
+        self.fps_frame_count = 0
+        self.current_fps = 0.0
+        self.infer_samples = 0
+        self.last_infer_time = 0.0
+        self.avg_infer_time = 0.0
+        self.using_fallback = False
+    
+    def _build_kwargs(self):
+        """
+        추론 인자 생성 (설정 + visual prompt)
+        
+        Returns:
+            model 호출 인자 딕셔너리
+        """
         kwargs = {'verbose': False}
         if self.config:
             kwargs.update(self.config.to_dict())
@@ -88,85 +269,207 @@ class InferenceEngine:
                     'predictor': YOLOEVPSegPredictor
                 })
         
-        results = self.model(frame_bgr, **kwargs)
-        infer_time = (time.time() - start_time) * 1000
+        return kwargs
+    
+    def _predict(self, model, frame_bgr, kwargs):
+        """
+        추론 실행 (predictor 재사용)
+        첫 호출, 모델/설정/프롬프트 변경 시에만 Model.__call__로 인자 파싱과 predictor 설정을 수행하고
+        이후에는 생성된 predictor를 직접 호출해 호출당 디스패치 오버헤드 제거
         
-        # 추론 시간 통계
-        self._update_infer_stats(infer_time)
+        Args:
+            model: 추론할 모델
+            frame_bgr: BGR 포맷의 입력 프레임
+            kwargs: 추론 인자
         
-        # 결과 처리
-        if self.is_engine:
-            result = results if not isinstance(results, list) else results[0]
-        else:
-            result = results[0] if isinstance(results, list) else results
+        Returns:
+            추론 결과 리스트
+        """
+        version = self._settings_version
+        if version != self._predictor_version:
+            self._sync_half()
         
-        # 결과 렌더링
-        annotated_frame = result.plot()
-        detected_count = len(result.boxes) if hasattr(result, 'boxes') else 0
+        predictor = getattr(model, 'predictor', None)
+        if (version != self._predictor_version or self._visual_prompt or predictor is None
+                or model is not self._predictor_model):
+            results = model(frame_bgr, **kwargs)
+            self._predictor_model = model
+            self._predictor_version = version
+            return results
         
-        # BGR → RGB → QImage
-        frame_rgb = cv2.cvtColor(annotated_frame, cv2.COLOR_BGR2RGB)
-        q_image = self._numpy_to_qimage(frame_rgb)
+        return predictor(source=frame_bgr, stream=False)
+    
+    def _sync_half(self):
+        """
+        FP16 설정 변경 반영 (워커 스레드에서만 호출)
+        FP16 여부는 predictor 생성 시 모델에 고정되므로 변경 시 predictor 폐기 후 재생성
+        """
+        half = getattr(self._config, 'half', None)
+        if half == self._half:
+            return
         
-        # 통계
-        stats = {
-            'fps': self.current_fps,
-            'infer_time': self.last_infer_time,
-            'avg_infer_time': self.avg_infer_time,
-            'detected_count': detected_count,
-            'frame_width': frame_bgr.shape[1],
-            'frame_height': frame_bgr.shape[0]
-        }
+        self._half = half
+        for model in (self.model, self.fallback_model):
+            if model is not None and getattr(model, 'predictor', None) is not None:
+                model.predictor = None
+        print(f"✅ FP16: {'ON' if half else 'OFF'} (predictor 재생성)")
+    
+    def _render(self, frame_bgr, result):
+        """
+        추론 결과를 디스플레이 크기로 시각화
+        박스만 있는 탐지 결과는 먼저 리사이즈한 뒤 축소된 프레임에 박스를 그리고
+        (전체 해상도 주석 + 리사이즈 두 번의 프레임 순회를 한 번으로 합침)
+        마스크/키포인트 등은 plot() 후 리사이즈
         
-        return q_image, stats
+        Args:
+            frame_bgr: 추론에 사용한 BGR 프레임
+            result: 추론 결과
+        
+        Returns:
+            디스플레이 크기의 시각화된 BGR 프레임
+        """
+        if len(result) == 0:
+            # 탐지 없음: 그릴 것이 없으므로 plot()/주석 복사 없이 리사이즈만
+            return self._resize_for_display(frame_bgr)
+        
+        if not self.annotator.supports(result):
+            return self._resize_for_display(result.plot())
+        
+        display_bgr = self._resize_for_display(frame_bgr)
+        if display_bgr is frame_bgr:
+            # 리사이즈가 없으면 원본 프레임 보호를 위해 복사본에 그림
+            return self.annotator.annotate(frame_bgr, result)
+        
+        self.annotator.draw(display_bgr, result, display_bgr.shape[1] / frame_bgr.shape[1])
+        return display_bgr
     
-    def reset_stats(self):
-        """통계 초기화"""
-        self.fps_start_time = time.time()
-        self.fps_frame_count = 0
-        self.current_fps = 0.0
-        self.infer_times = []
-        self.last_infer_time = 0.0
-        self.avg_infer_time = 0.0
+    def _select_model(self):
+        """
+        부하에 따른 추론 모델 선택
+        30프레임 이상 누적된 평균 추론 시간이 목표 프레임 주기(소스 FPS)를 넘으면 경량 모델로 전환
+        (경량 모델은 첫 전환 시 로드 후 유지, reset_stats 시 원래 모델로 복귀)
+        
+        Returns:
+            이번 프레임에 사용할 모델
+        """
+        if not self.fallback_enabled or self.fallback_loader is None or not self.target_fps:
+            self.using_fallback = False
+            return self.model
+        
+        if not self.using_fallback and self.infer_samples >= self.FALLBACK_MIN_SAMPLES:
+            period_ms = 1000.0 / self.target_fps
+            if self.avg_infer_time > period_ms and self._load_fallback():
+                self.using_fallback = True
+                self.infer_samples = 0
+                print(f"⚠️ 평균 추론 {self.avg_infer_time:.1f}ms > 목표 {period_ms:.1f}ms - "
+                      f"경량 모델 전환: {Path(self.fallback_path).name}")
+        
+        return self.fallback_model if self.using_fallback else self.model
+    
+    def _load_fallback(self):
+        """
+        경량 모델 로드 및 워밍업 (첫 전환 시 1회, 워커 스레드)
+        로드 실패나 후보 없음은 알리고 현재 모델에 대해 자동 전환 중지
+        
+        Returns:
+            경량 모델 사용 가능 여부
+        """
+        if self.fallback_model is not None:
+            return True
+        
+        try:
+            model, model_path = self.fallback_loader()
+        except Exception as e:
+            print(f"❌ 경량 모델 로드 실패: {e} - 자동 전환 중지")
+            self.fallback_loader = None
+            return False
+        
+        if model is None:
+            print("⚠️ 같은 task의 더 작은 모델이 없음 - 자동 전환 중지")
+            self.fallback_loader = None
+            return False
+        
+        self.warmup(model)
+        self.fallback_model = model
+        self.fallback_path = model_path
+        return True
     
-    def _update_fps(self):
-        """FPS 계산"""
-        self.fps_frame_count += 1
-        elapsed = time.time() - self.fps_start_time
+    def _update_fps(self, now, count=1):
+        """
+        FPS 계산
+        
+        Args:
+            now: 현재 시각 (time.perf_counter, 호출측 측정값 재사용)
+            count: 처리한 프레임 수
+        """
+        self.fps_frame_count += count
+        elapsed = now - self.fps_start_time
         
         if elapsed >= 1.0:
             self.current_fps = self.fps_frame_count / elapsed
-            self.fps_start_time = time.time()
+            self.fps_start_time = now
             self.fps_frame_count = 0
     
     def _update_infer_stats(self, infer_time):
-        """추론 시간 통계 업데이트"""
+        """추론 시간 통계 업데이트 (첫 샘플은 그대로, 이후 지수이동평균)"""
         self.last_infer_time = infer_time
-        self.infer_times.append(infer_time)
-        
-        if len(self.infer_times) > 30:
-            self.infer_times.pop(0)
         
-        self.avg_infer_time = sum(self.infer_times) / len(self.infer_times)
+        if self.infer_samples == 0:
+            self.avg_infer_time = infer_time
+        else:
+            self.avg_infer_time += self.INFER_EMA_ALPHA * (infer_time - self.avg_infer_time)
+        self.infer_samples += 1
     
-    @staticmethod
-    def _numpy_to_qimage(frame_rgb):
-        """numpy 배열을 QImage로 변환"""
-        height, width, channel = frame_rgb.shape
-        bytes_per_line = 3 * width
-        return QImage(frame_rgb.data, width, height, 
-                     bytes_per_line, QImage.Format_RGB888).copy()
+    def _resize_for_display(self, frame):
+        """
+        디스플레이 크기에 맞게 비율 유지 리사이즈 (OpenCV SIMD 리사이즈)
+        결과는 매번 새 배열: UI 스레드가 표시할 때까지 워커가 덮어쓰지 않음
+        
+        Args:
+            frame: 입력 프레임
+        
+        Returns:
+            리사이즈된 프레임 (display_size가 없으면 원본)
+        """
+        display_size = self.display_size
+        if not display_size:
+            return frame
+        
+        height, width = frame.shape[:2]
+        scale = min(display_size[0] / width, display_size[1] / height)
+        target_w = max(1, int(width * scale))
+        target_h = max(1, int(height * scale))
+        
+        if (target_w, target_h) == (width, height):
+            return frame
+        
+        # 축소는 INTER_AREA (SIMD, 앨리어싱 없음), 확대는 INTER_NEAREST (Qt.FastTransformation과 동일 품질)
+        # 일시정지 중 단일 프레임 재렌더링은 비용이 문제되지 않으므로 INTER_LINEAR로 부드럽게 확대
+        if target_w < width:
+            interpolation = cv2.INTER_AREA
+        else:
+            interpolation = cv2.INTER_LINEAR if self.smooth_upscale else cv2.INTER_NEAREST
+        
+        return cv2.resize(frame, (target_w, target_h), interpolation=interpolation)
     
     @staticmethod
-    def scale_pixmap(q_image, label_size, cache=None):
-        """QImage를 레이블 크기에 맞게 스케일링"""
-        pixmap = QPixmap.fromImage(q_image)
-        cache_key = (label_size.width(), label_size.height(), pixmap.cacheKey())
+    def to_pixmap(frame_bgr):
+        """
+        BGR numpy 배열을 QPixmap으로 변환
+        QImage는 numpy 버퍼를 참조만 하고(copy 없음) fromImage에서 한 번만 복사
+        호출 중에는 frame_bgr 참조가 유지되므로 버퍼 수명이 보장됨
         
-        if cache and cache[0] == cache_key:
-            return cache[1], cache_key
+        Args:
+            frame_bgr: BGR 포맷 프레임
         
-        scaled = pixmap.scaled(label_size, Qt.KeepAspectRatio, Qt.FastTransformation)
-        return scaled, cache_key
+        Returns:
+            QPixmap 객체
+        """
+        frame_bgr = np.ascontiguousarray(frame_bgr)
+        height, width, channel = frame_bgr.shape
+        bytes_per_line = 3 * width
+        q_image = QImage(frame_bgr.data, width, height, 
+                         bytes_per_line, QImage.Format_BGR888)
+        return QPixmap.fromImage(q_image)
 
 
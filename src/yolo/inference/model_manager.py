@@ -2,9 +2,10 @@
 """
 YOLO 모델 관리자
 모델 로딩, YOLOE 설정, 모델 전환을 담당
+(ultralytics는 torch를 함께 로드하므로 실제 모델 로드 시점에 import)
 """
+import functools
 from pathlib import Path
-from ultralytics import YOLO
 
 
 class BaseModelManager:
@@ -18,6 +19,7 @@ class BaseModelManager:
         self.models_dir = Path(models_dir)
         self.current_model = None
         self.model_list = []
+        self._fallback_cache = (None, None)  # ((경로, task), 모델)
     
     @property
     def file_extension(self):
@@ -67,6 +69,45 @@ class BaseModelManager:
         self.current_model = self._load_single_model(model_path, task)
         return self.current_model
     
+    def load_fallback_model(self, current_path, task=None):
+        """
+        부하 대응용 경량 모델 로드
+        선택된 task와 같은 task의 모델 중 현재 모델보다 파일 크기가 작은 가장 작은 모델 선택
+        
+        Args:
+            current_path: 현재 모델 파일 경로
+            task: 현재 모델의 task (UI에서 선택한 값, None이면 파일명에서 추론)
+        
+        Returns:
+            (model, model_path): 후보가 없으면 (None, None)
+        """
+        if not current_path:
+            return None, None
+        
+        task = task or self._detect_task(current_path)
+        current_size = Path(current_path).stat().st_size
+        candidates = [
+            path for _, path in self.model_list
+            if not self._is_yoloe_model(path)
+            and self._detect_task(path) == task
+            and Path(path).stat().st_size < current_size
+        ]
+        
+        if not candidates:
+            return None, None
+        
+        model_path = min(candidates, key=lambda p: Path(p).stat().st_size)
+        
+        # 이미 로드한 경량 모델은 재사용
+        cached_key, cached_model = self._fallback_cache
+        if cached_key == (model_path, task):
+            return cached_model, model_path
+        
+        model = self._load_single_model(model_path, task)
+        self._fallback_cache = ((model_path, task), model)
+        print(f"✅ 경량 모델: {Path(model_path).name}")
+        return model, model_path
+    
     def _load_single_model(self, model_path, task=None):
         """
         단일 모델 로드 (YOLOE 자동 처리)
@@ -79,6 +120,8 @@ class BaseModelManager:
         Returns:
             로드된 YOLO 모델
         """
+        from ultralytics import YOLO
+        
         model_path = str(model_path)
         
         # YOLOE 모델 처리
@@ -97,6 +140,8 @@ class BaseModelManager:
         """
         YOLOE 모델 로드 (YOLOEModelManager에서 오버라이드)
         """
+        from ultralytics import YOLO
+        
         model = YOLO(model_path)
         
         # .pt 파일 중 prompt-free가 아닌 모델만 프롬프트 지원
@@ -131,24 +176,38 @@ class BaseModelManager:
             print(f"⚠️ YOLOE 프롬프트 설정 실패: {e}")
     
     @staticmethod
-    def _is_yoloe_model(model_path):
-        """YOLOE 모델인지 확인"""
-        return "yoloe" in Path(model_path).stem.lower()
+    @functools.lru_cache(maxsize=64)
+    def file_info(model_path):
+        """모델 파일 (파일명, 크기 MB) 조회 (경로별 캐시, 모델 전환마다 stat 반복 제거)"""
+        path = Path(model_path)
+        return path.name, path.stat().st_size / (1024 * 1024)
     
     @staticmethod
-    def _is_pt_file(model_path):
+    @functools.lru_cache(maxsize=64)
+    def _parse_path(model_path):
+        """경로를 (소문자 stem, 소문자 suffix)로 파싱 (경로별 캐시)"""
+        path = Path(model_path)
+        return path.stem.lower(), path.suffix.lower()
+    
+    @classmethod
+    def _is_yoloe_model(cls, model_path):
+        """YOLOE 모델인지 확인"""
+        return "yoloe" in cls._parse_path(str(model_path))[0]
+    
+    @classmethod
+    def _is_pt_file(cls, model_path):
         """PyTorch 모델 파일인지 확인"""
-        return Path(model_path).suffix.lower() == '.pt'
+        return cls._parse_path(str(model_path))[1] == '.pt'
     
-    @staticmethod
-    def _is_prompt_free(model_path):
+    @classmethod
+    def _is_prompt_free(cls, model_path):
         """Prompt-free 모델인지 확인 ('-pf' 포함)"""
-        return '-pf' in Path(model_path).stem.lower()
+        return '-pf' in cls._parse_path(str(model_path))[0]
     
-    @staticmethod
-    def _detect_task(model_path):
+    @classmethod
+    def _detect_task(cls, model_path):
         """파일명에서 task 추론"""
-        name = Path(model_path).stem.lower()
+        name = cls._parse_path(str(model_path))[0]
         
         if 'seg' in name or 'segment' in name:
             return 'segment'
@@ -195,6 +254,8 @@ class TensorRTModelManager(BaseModelManager):
         Returns:
             로드된 YOLO 모델
         """
+        from ultralytics import YOLO
+        
         model = YOLO(model_path)
         mode = "prompt-free" if self._is_prompt_free(model_path) else "고정 vocabulary"
         print(f"ℹ️ YOLOE ({mode})")
@@ -243,6 +304,8 @@ class YOLOEModelManager(BaseModelManager):
         """
         YOLOE 모델 로드 (저장된 프롬프트 사용)
         """
+        from ultralytics import YOLO
+        
         model = YOLO(model_path)
         
         # .pt 파일 중 prompt-free가 아닌 모델만 프롬프트 지원
@@ -3,53 +3,161 @@
 추론 워커 스레드
 백그라운드에서 YOLO 추론 수행
 """
-from PySide6.QtCore import QThread, Signal, QMutex, QMutexLocker
+import gc
+import os
+import sys
+import threading
+import time
+from collections import deque
+from PySide6.QtCore import QThread, Signal, QMutex, QMutexLocker, QWaitCondition
 
 
 class InferenceWorker(QThread):
-    """비동기 추론 워커"""
+    """
+    비동기 추론 워커
+    최신 프레임 max_batch장만 보관 (처리 중 도착한 이전 프레임은 버림 - appsink drop=true 방식)
+    max_batch가 2 이상이면 처리 중 쌓인 프레임을 한 번의 forward로 배치 추론
+    """
     
-    result_ready = Signal(object, dict)  # (QImage, stats)
+    result_ready = Signal(object, dict)  # (display_bgr 또는 배치 프레임 리스트, stats)
+    
+    # 처리량 우선 모드의 최대 배치 (실제 배치 크기는 추론 중 쌓인 프레임 수에 따라 1~4로 자동 조절)
+    THROUGHPUT_MAX_BATCH = 4
+    # 배치가 덜 찼을 때 추가 프레임을 기다리는 최대 시간 (단일 프레임 지연 상한)
+    BATCH_FILL_TIMEOUT_MS = 10
+    # Linux 워커 스레드 nice 값 (음수 = 높은 우선순위, CAP_SYS_NICE 권한 필요)
+    LINUX_NICE = -5
+    _priority_warned = False  # 권한 부족 경고는 프로세스당 1회 (워커는 소스 시작/워밍업마다 재시작됨)
     
     def __init__(self, inference_engine):
         super().__init__()
         self.inference_engine = inference_engine
-        self.current_frame = None
+        self.pending_frames = deque(maxlen=1)
         self.frame_mutex = QMutex()
+        self.frame_available = QWaitCondition()
         self.running = False
-        self.processing = False
+        self.dropped_frames = 0  # 추론 전에 최신 프레임에 밀려 버려진 프레임 수
+        self._warmup_pending = False  # 다음 루프에서 모델 워밍업 수행 여부
+    
+    def set_max_batch(self, max_batch):
+        """
+        한 번에 추론할 최대 프레임 수 설정 (1: 최저 지연, 2 이상: 처리량 우선)
+        
+        Args:
+            max_batch: 보관할 최신 프레임 수
+        """
+        with QMutexLocker(self.frame_mutex):
+            self.pending_frames = deque(self.pending_frames, maxlen=max_batch)
+    
+    def request_warmup(self):
+        """
+        모델 워밍업 요청 (워커 스레드에서 수행해 UI 스레드를 막지 않음)
+        워커가 멈춰 있으면 시작하며, 이후 제출된 프레임보다 먼저 처리됨
+        """
+        with QMutexLocker(self.frame_mutex):
+            self._warmup_pending = True
+            self.frame_available.wakeOne()
+        if not self.isRunning():
+            self.start()
+    
+    def reset_stats(self):
+        """드롭 프레임 수 초기화"""
+        with QMutexLocker(self.frame_mutex):
+            self.dropped_frames = 0
     
     def submit_frame(self, frame_bgr):
-        """새 프레임 제출 (최신 프레임으로 덮어씀)"""
+        """새 프레임 제출 (가득 차면 가장 오래된 프레임을 버림, 리스트면 배치 추론)"""
         with QMutexLocker(self.frame_mutex):
-            self.current_frame = frame_bgr
+            if len(self.pending_frames) == self.pending_frames.maxlen:
+                self.dropped_frames += 1
+            self.pending_frames.append(frame_bgr)
+            self.frame_available.wakeOne()
     
     def run(self):
         """워커 스레드 메인 루프"""
+        self._raise_priority()
         self.running = True
         
         while self.running:
-            frame = None
+            # 새 프레임이 올 때까지 대기 (폴링 없음)
             with QMutexLocker(self.frame_mutex):
-                if self.current_frame is not None:
-                    frame = self.current_frame
-                    self.current_frame = None
+                while self.running and not self.pending_frames and not self._warmup_pending:
+                    self.frame_available.wait(self.frame_mutex)
+                warmup, self._warmup_pending = self._warmup_pending, False
+                if warmup:
+                    frames = []
+                else:
+                    self._wait_batch_fill()
+                    frames = list(self.pending_frames)
+                    self.pending_frames.clear()
+            
+            if warmup:
+                self._warmup()
+                continue
             
-            if frame is not None:
-                self.processing = True
-                try:
-                    q_image, stats = self.inference_engine.process_frame(frame)
-                    self.result_ready.emit(q_image, stats)
-                except Exception as e:
-                    print(f"⚠️ 추론 오류: {e}")
-                finally:
-                    self.processing = False
-            else:
-                self.msleep(1)
+            if not frames:
+                continue
+            
+            # 여러 장이 쌓였으면 배치로 묶음 (비디오 배치는 이미 리스트로 제출됨)
+            frame = frames[0] if len(frames) == 1 else frames
+            try:
+                if isinstance(frame, list):
+                    display_bgr, stats = self.inference_engine.process_batch(frame)
+                else:
+                    display_bgr, stats = self.inference_engine.process_frame(frame)
+                stats['dropped'] = self.dropped_frames
+                self.result_ready.emit(display_bgr, stats)
+            except Exception as e:
+                print(f"⚠️ 추론 오류: {e}")
+    
+    def _raise_priority(self):
+        """
+        워커 스레드 우선순위 상향 (GPU 작업을 조율하므로 UI/카메라 스레드보다 먼저 스케줄)
+        Linux 기본 스케줄러(SCHED_OTHER)는 QThread 우선순위를 무시하므로 스레드 nice 값을 직접 낮춤
+        (PRIO_PROCESS + 네이티브 스레드 ID는 해당 스레드에만 적용)
+        """
+        if not sys.platform.startswith('linux'):
+            self.setPriority(QThread.HighPriority)
+            return
+        
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.LINUX_NICE)
+        except PermissionError:
+            if not InferenceWorker._priority_warned:
+                InferenceWorker._priority_warned = True
+                print(f"⚠️ 워커 우선순위 상향 실패 (nice {self.LINUX_NICE}은 CAP_SYS_NICE 필요) - 기본 우선순위로 실행")
+    
+    def _warmup(self):
+        """현재 모델 워밍업 (CUDA 컨텍스트/엔진 초기화를 첫 프레임 전에 수행, 경량 모델은 로드 시 워밍업)"""
+        try:
+            self.inference_engine.warmup()
+        except Exception as e:
+            print(f"⚠️ 워밍업 오류: {e}")
+        
+        # 시작/모델 교체 직후에만 실행: 이전에 고정한 객체(교체된 모델)를 해제해 회수한 뒤
+        # 새 모델/predictor 등 장수명 객체를 다시 고정 (프레임 루프 중 GC 스캔 대상 축소)
+        # 전체 수집은 GIL을 잡으므로 그동안 UI 스레드도 멈춤 - 프레임 루프에서는 호출하지 않음
+        gc.unfreeze()
+        gc.collect()
+        gc.freeze()
+    
+    def _wait_batch_fill(self):
+        """처리량 우선 모드에서 배치가 찰 때까지 최대 BATCH_FILL_TIMEOUT_MS 대기 (frame_mutex 보유 상태에서 호출)"""
+        max_batch = self.pending_frames.maxlen
+        if max_batch <= 1:
+            return
+        
+        deadline = time.perf_counter() + self.BATCH_FILL_TIMEOUT_MS / 1000
+        while self.running and len(self.pending_frames) < max_batch:
+            remaining_ms = int((deadline - time.perf_counter()) * 1000)
+            if remaining_ms <= 0 or not self.frame_available.wait(self.frame_mutex, remaining_ms):
+                break
     
     def stop(self):
         """워커 중지"""
-        self.running = False
+        with QMutexLocker(self.frame_mutex):
+            self.running = False
+            self.frame_available.wakeAll()
         self.wait(2000)
 
 
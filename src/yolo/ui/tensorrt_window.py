@@ -3,12 +3,13 @@
 TensorRT 전용 윈도우
 엔진 정보 표시 + 카메라/비디오 제어
 """
+import os
 from pathlib import Path
 from PySide6.QtWidgets import (QMainWindow, QLabel, QVBoxLayout, QWidget, 
                                 QPushButton, QHBoxLayout, QSizePolicy, QComboBox, 
-                                QGroupBox, QRadioButton, QButtonGroup, 
+                                QGroupBox, QRadioButton, QButtonGroup, QCheckBox, 
                                 QTextEdit, QScrollArea)
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer, QObject
 from camera.camera_controller import CameraController
 from camera.video_file_controller import VideoFileController
 from ui.widgets.camera_control_widget import CameraControlWidget
@@ -33,21 +34,39 @@ class TensorRTWindow(QMainWindow):
             self.inference_config
         )
         
+        # 부하 대응 경량 모델 (옵션을 켠 경우에만 첫 전환 시 워커 스레드에서 로드)
+        self.inference_engine.set_fallback_loader(self._fallback_loader(self.inference_engine.model_path, None))
+        
         self.inference_worker = InferenceWorker(self.inference_engine)
         self.inference_worker.result_ready.connect(self._on_inference_result)
+        self.inference_worker.request_warmup()  # 모델 워밍업은 워커 스레드에서 (창 표시 지연 없음)
         
         self.source = None
         self.source_type = 'camera'
         self.is_running = False
         self.is_paused = False
-        self.video_files = self._scan_video_files()
-        self._pixmap_cache = None
+        self.video_files = []  # 창 표시 후 _populate_video_files에서 채움
+        self._pending_result = None
+        self._flush_scheduled = False
+        self._latest_stats = None  # 상태 라벨에 아직 표시하지 않은 최신 통계
+        self._source_connections = []  # 소스 시그널 연결 핸들 (중지 시 일괄 해제)
+        
+        # 상태 라벨은 타이머로 5Hz 갱신 (매 프레임 텍스트 레이아웃 방지)
+        self._status_timer = QTimer(self)
+        self._status_timer.setInterval(200)
+        self._status_timer.timeout.connect(self._refresh_status_label)
+        self._status_timer.start()
+        self._batch_id = 0  # 배치 순차 표시 세대 (새 배치가 오면 이전 표시 취소)
+        self._info_cache = {}  # (model_path, task) -> 정보 텍스트
         
         self.setWindowTitle("YOLO TensorRT Engine")
         self.setGeometry(100, 100, 1400, 720)
         self._init_ui()
         self._update_source_ui()
         self._init_camera_early()
+        
+        # 샘플 폴더 스캔은 창 구성 이후로 미룸 (느린 디스크에서 시작 지연 방지)
+        QTimer.singleShot(0, self._populate_video_files)
     
     def _init_ui(self):
         """UI 초기화"""
@@ -105,6 +124,7 @@ class TensorRTWindow(QMainWindow):
         self.camera_widget = CameraControlWidget()
         self.camera_widget.start_camera.connect(self._on_start_camera)
         self.camera_widget.stop_camera.connect(self._on_stop_camera)
+        self.camera_widget.throughput_changed.connect(self._on_throughput_changed)
         layout.addWidget(self.camera_widget)
         
         # 비디오 제어
@@ -114,6 +134,7 @@ class TensorRTWindow(QMainWindow):
         self.video_widget.step_frame.connect(self._on_step_frame)
         self.video_widget.seek_requested.connect(self._on_seek_frame)
         self.video_widget.fps_changed.connect(self._on_fps_changed)
+        self.video_widget.batch_changed.connect(self._on_batch_changed)
         self.video_widget.loop_changed.connect(self._on_loop_changed)
         layout.addWidget(self.video_widget)
         
@@ -145,7 +166,7 @@ class TensorRTWindow(QMainWindow):
         model_path = self.model_manager.model_list[0][1]
         
         info_text = self._get_engine_info(model, model_path)
-        self.info_text.setText(info_text)
+        self.info_text.setPlainText(info_text)
         
         info_layout.addWidget(self.info_text)
         info_widget.setLayout(info_layout)
@@ -156,12 +177,20 @@ class TensorRTWindow(QMainWindow):
         return group
     
     def _get_engine_info(self, model, model_path):
+        """엔진 상세 정보 (모델별 캐시, 이전 모델로 되돌아오면 재생성 생략)"""
+        key = (model_path, getattr(model, 'task', None))
+        info_text = self._info_cache.get(key)
+        if info_text is None:
+            info_text = self._info_cache[key] = self._build_engine_info(model, model_path)
+        return info_text
+    
+    def _build_engine_info(self, model, model_path):
         """엔진 상세 정보 생성"""
         info = []
         
         # 기본 정보
-        info.append(f"📄 파일: {Path(model_path).name}")
-        file_size_mb = Path(model_path).stat().st_size / (1024 * 1024)
+        file_name, file_size_mb = self.model_manager.file_info(model_path)
+        info.append(f"📄 파일: {file_name}")
         info.append(f"💾 크기: {file_size_mb:.1f} MB")
         
         if hasattr(model, 'task'):
@@ -170,8 +199,7 @@ class TensorRTWindow(QMainWindow):
         # 클래스 정보
         if hasattr(model, 'names'):
             info.append(f"\n📋 클래스 ({len(model.names)}개):")
-            for idx, name in model.names.items():
-                info.append(f"  {idx}: {name}")
+            info.append('\n'.join(f"  {idx}: {name}" for idx, name in model.names.items()))
         
         # 엔진 세부 정보
         info.append(f"\n⚙️ 엔진 구조:")
@@ -201,7 +229,7 @@ class TensorRTWindow(QMainWindow):
         
         # NMS 플러그인 감지
         try:
-            model_name = Path(model_path).name.lower()
+            model_name = file_name.lower()
             if 'e2e' in model_name or 'end2end' in model_name:
                 info.append(f"\n  🔌 NMS 플러그인: EfficientNMS_TRT (E2E)")
             else:
@@ -241,9 +269,6 @@ class TensorRTWindow(QMainWindow):
         layout = QVBoxLayout()
         
         self.video_combo = QComboBox()
-        for video_path in self.video_files:
-            video_name = Path(video_path).name
-            self.video_combo.addItem(video_name, video_path)
         layout.addWidget(self.video_combo)
         
         group.setLayout(layout)
@@ -262,21 +287,53 @@ class TensorRTWindow(QMainWindow):
         self.model_combo.currentIndexChanged.connect(self._on_model_changed)
         layout.addWidget(self.model_combo)
         
+        # 부하 대응 경량 모델 자동 전환 (기본 꺼짐)
+        layout.addWidget(self._create_fallback_check())
+        
         group.setLayout(layout)
         return group
     
+    def _create_fallback_check(self):
+        """부하 대응 경량 모델 자동 전환 옵션 (기본 꺼짐, 경량 모델은 첫 전환 시 로드)"""
+        self.fallback_check = QCheckBox("부하 시 경량 모델 자동 전환")
+        self.fallback_check.setToolTip("평균 추론 시간이 입력 소스의 프레임 주기를 넘으면 "
+                                       "같은 task의 더 작은 모델로 전환 (중지/재시작 시 원래 모델로 복귀)")
+        self.fallback_check.toggled.connect(self._on_fallback_toggled)
+        return self.fallback_check
+    
+    def _on_fallback_toggled(self, enabled):
+        """경량 모델 자동 전환 옵션 변경"""
+        self.inference_engine.fallback_enabled = enabled
+        print(f"✅ 경량 모델 자동 전환: {'ON' if enabled else 'OFF'}")
+    
+    def _fallback_loader(self, model_path, task):
+        """
+        경량 모델 로더 생성 (엔진이 첫 전환 시 워커 스레드에서 호출)
+        
+        Args:
+            model_path: 현재 모델 파일 경로
+            task: 현재 모델의 task (None이면 파일명에서 추론)
+        """
+        return lambda: self.model_manager.load_fallback_model(model_path, task)
+    
+    def _populate_video_files(self):
+        """비디오 파일 목록 스캔 후 콤보박스 채우기 (이벤트 루프 시작 후 1회)"""
+        self.video_files = self._scan_video_files()
+        for video_name, video_path in self.video_files:
+            self.video_combo.addItem(video_name, video_path)
+    
     def _scan_video_files(self):
-        """비디오 파일 스캔"""
+        """비디오 파일 스캔 (scandir 1회 순회 + 확장자 집합 검사, (파일명, 경로) 목록 반환)"""
         samples_dir = Path(__file__).parent.parent / "samples"
         if not samples_dir.exists():
             return []
         
-        extensions = ['.mp4', '.avi', '.mov', '.mkv', '.webm']
-        video_files = []
-        for ext in extensions:
-            video_files.extend(samples_dir.glob(f"*{ext}"))
+        extensions = {'.mp4', '.avi', '.mov', '.mkv', '.webm'}
+        with os.scandir(samples_dir) as entries:
+            video_files = [(entry.name, entry.path) for entry in entries
+                           if entry.is_file() and os.path.splitext(entry.name)[1].lower() in extensions]
         
-        return sorted([str(f) for f in video_files])
+        return sorted(video_files)
     
     def _init_camera_early(self):
         """카메라 사전 초기화"""
@@ -345,16 +402,18 @@ class TensorRTWindow(QMainWindow):
         self.inference_engine.model = new_model
         self.inference_engine.model_path = model_path
         self.inference_engine.is_engine = True
+        self.inference_engine.set_fallback_loader(self._fallback_loader(model_path, 'detect'))
+        self.inference_worker.request_warmup()
         
         # 정보 업데이트
         self._update_engine_info(new_model, model_path)
         
-        print(f"✅ 엔진 변경: {Path(model_path).name}")
+        print(f"✅ 엔진 변경: {self.model_combo.itemText(index)}")
     
     def _update_engine_info(self, model, model_path):
         """엔진 정보 업데이트"""
         info_text = self._get_engine_info(model, model_path)
-        self.info_text.setText(info_text)
+        self.info_text.setPlainText(info_text)
     
     def _on_start_camera(self):
         """카메라 시작"""
@@ -366,7 +425,8 @@ class TensorRTWindow(QMainWindow):
         self.is_paused = False
         self.source.is_running = True
         self.inference_engine.reset_stats()
-        self._pixmap_cache = None
+        self.inference_worker.reset_stats()
+        self.inference_engine.target_fps = None  # 카메라 FPS는 측정 후 _flush_result에서 반영
         
         if not self.inference_worker.isRunning():
             self.inference_worker.start()
@@ -398,9 +458,26 @@ class TensorRTWindow(QMainWindow):
             return
         
         self.source.target_fps = fps
+        self.inference_engine.target_fps = fps
         if hasattr(self.source, '_update_timer_interval'):
             self.source._update_timer_interval()
     
+    def _on_batch_changed(self, batch_size):
+        """배치 크기 변경 (비디오 파일 전용)"""
+        # 파일 모드로 전환 직후에는 source가 아직 카메라일 수 있음
+        if not isinstance(self.source, VideoFileController):
+            return
+        
+        self.source.batch_size = batch_size
+        self.source._update_timer_interval()
+        print(f"✅ 배치 크기: {batch_size}")
+    
+    def _on_throughput_changed(self, enabled):
+        """카메라 처리량 우선 모드 변경 (처리 중 쌓인 프레임을 최대 4장까지 배치 추론)"""
+        if self.source_type == 'camera':
+            self.inference_worker.set_max_batch(InferenceWorker.THROUGHPUT_MAX_BATCH if enabled else 1)
+        print(f"✅ 처리량 우선 모드: {'ON' if enabled else 'OFF'}")
+    
     def _on_inference_config_changed(self, config):
         """추론 설정 변경 (재생/일시정지 중 모두 적용)"""
         self.inference_config = config
@@ -464,42 +541,110 @@ class TensorRTWindow(QMainWindow):
             self._process_single_frame(frame)
     
     def _process_single_frame(self, frame):
-        """단일 프레임 추론 (일시정지용)"""
-        q_image, stats = self.inference_engine.process_frame(frame)
-        self._display_frame(q_image)
-        self._update_status_label(stats)
+        """단일 프레임 추론 요청 (일시정지용, 결과는 워커 시그널로 표시)"""
+        if not self.inference_worker.isRunning():
+            self.inference_worker.start()
+        self.inference_worker.submit_frame(frame)
     
     def _on_frame_ready(self, frame_bgr):
-        """프레임 콜백"""
-        if not self.is_running or self.inference_worker.processing:
+        """
+        프레임 콜백 (DirectConnection - 소스 스레드에서 직접 호출)
+        위젯 접근 없이 플래그 확인과 워커 제출(mutex 보호)만 수행
+        워커가 처리 중이어도 최신 프레임으로 덮어써서 처리 직후 바로 이어서 추론
+        """
+        if not self.is_running:
             return
         
         self.inference_worker.submit_frame(frame_bgr)
     
-    def _on_inference_result(self, q_image, stats):
-        """추론 결과 콜백"""
-        if not self.is_running:
+    def _on_inference_result(self, display_bgr, stats):
+        """추론 결과 콜백 (표시 전까지 최신 결과만 유지)"""
+        if not (self.is_running or self.is_paused):
+            return
+        
+        # 이벤트 루프에 결과가 밀려 있으면 이전 결과는 덮어써서 버림
+        self._pending_result = (display_bgr, stats)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            QTimer.singleShot(0, self._flush_result)
+    
+    def _flush_result(self):
+        """대기 중인 최신 추론 결과 표시"""
+        self._flush_scheduled = False
+        result, self._pending_result = self._pending_result, None
+        if result is None or not (self.is_running or self.is_paused):
+            return
+        
+        display_bgr, stats = result
+        if self.source_type == 'camera':
+            # 경량 모델 전환 기준은 측정된 카메라 프레임 속도
+            self.inference_engine.target_fps = self.source.frame_rate or None
+        # 재생 중 최소화/가려진 상태면 픽스맵 변환과 표시는 생략 (통계는 계속 갱신)
+        # 일시정지 프레임은 다음 프레임이 오지 않으므로 항상 표시 (복원 시 이전 화면 방지)
+        if self.is_paused or self._is_video_visible():
+            if isinstance(display_bgr, list):
+                self._display_batch(display_bgr, stats)
+            else:
+                self._display_frame(display_bgr)
+        self._update_status_label(stats, force=self.is_paused)
+    
+    def _is_video_visible(self):
+        """비디오 레이블이 실제로 화면에 보이는지 확인"""
+        return (not self.isMinimized()
+                and self.video_label.isVisible()
+                and not self.video_label.visibleRegion().isEmpty())
+    
+    def _display_frame(self, display_bgr):
+        """프레임 디스플레이 (엔진에서 레이블 크기로 리사이즈됨)"""
+        self.video_label.setPixmap(InferenceEngine.to_pixmap(display_bgr))
+    
+    def _display_batch(self, display_frames, stats):
+        """배치 추론 결과를 재생 FPS(카메라는 처리 FPS) 간격으로 순차 표시"""
+        self._batch_id += 1
+        batch_id = self._batch_id
+        if self.source_type == 'file':
+            interval_ms = 1000 / self.video_widget.fps_slider.value()
+        else:
+            interval_ms = 1000 / stats['fps'] if stats['fps'] > 0 else 0
+        
+        self._display_frame(display_frames[0])
+        for i, display_bgr in enumerate(display_frames[1:], start=1):
+            QTimer.singleShot(int(i * interval_ms),
+                              lambda f=display_bgr: self._display_batch_frame(batch_id, f))
+    
+    def _display_batch_frame(self, batch_id, display_bgr):
+        """배치 내 지연 표시 프레임 (중지되었거나 새 배치가 도착했으면 무시)"""
+        if self.is_running and batch_id == self._batch_id:
+            self._display_frame(display_bgr)
+    
+    def _update_status_label(self, stats, force=False):
+        """
+        최신 통계 저장 (라벨은 _status_timer가 5Hz로 갱신)
+        
+        Args:
+            stats: 추론 통계 딕셔너리
+            force: True면 타이머를 기다리지 않고 즉시 표시
+        """
+        self._latest_stats = stats
+        if force:
+            self._refresh_status_label()
+    
+    def _refresh_status_label(self):
+        """대기 중인 최신 통계로 상태 라벨 갱신 (새 통계가 없으면 생략)"""
+        stats, self._latest_stats = self._latest_stats, None
+        if stats is None:
             return
         
-        self._display_frame(q_image)
-        self._update_status_label(stats)
-    
-    def _display_frame(self, q_image):
-        """프레임 디스플레이"""
-        label_size = self.video_label.size()
-        scaled_pixmap, cache_key = InferenceEngine.scale_pixmap(
-            q_image, label_size, self._pixmap_cache
-        )
-        self._pixmap_cache = (cache_key, scaled_pixmap)
-        self.video_label.setPixmap(scaled_pixmap)
-    
-    def _update_status_label(self, stats):
-        """상태 라벨 업데이트"""
         text = (f"FPS: {stats['fps']:.1f} | "
                 f"추론: {stats['infer_time']:.1f}ms "
                 f"(평균: {stats['avg_infer_time']:.1f}ms) | "
                 f"탐지: {stats['detected_count']} | "
+                f"드롭: {stats['dropped']} | "
                 f"해상도: {stats['frame_width']}x{stats['frame_height']}")
+        if stats['fallback']:
+            text += f" | ⚠️ 경량 모델 전환됨: {Path(stats['fallback']).name}"
+        if self.is_paused:
+            text = f"일시정지 | {text}"  # 단일 프레임 결과가 일시정지 표시를 덮지 않도록
         self.status_label.setText(text)
     
     def _on_start(self):
@@ -511,12 +656,13 @@ class TensorRTWindow(QMainWindow):
         self.is_paused = False
         self.source.is_running = True
         self.inference_engine.reset_stats()
-        self._pixmap_cache = None
+        self.inference_worker.reset_stats()
         
         if not self.inference_worker.isRunning():
             self.inference_worker.start()
         
         target_fps = self.video_widget.fps_slider.value()
+        self.inference_engine.target_fps = target_fps
         self.source.start_trigger(target_fps)
         
         self.video_widget.set_playing(True)
@@ -531,11 +677,13 @@ class TensorRTWindow(QMainWindow):
         
         self.is_paused = True
         self.is_running = False
+        self.inference_engine.smooth_upscale = True  # 정지 화면은 선형 보간 확대
         self.source.is_running = False
         self.source.stop_trigger()
         
         self.video_widget.set_playing(False)
         self.video_widget.set_controls_enabled(True)
+        self._latest_stats = None
         self.status_label.setText("일시정지")
         print("⏸ 일시정지")
     
@@ -546,9 +694,11 @@ class TensorRTWindow(QMainWindow):
         
         self.is_paused = False
         self.is_running = True
+        self.inference_engine.smooth_upscale = False
         self.source.is_running = True
         
         target_fps = self.video_widget.fps_slider.value()
+        self.inference_engine.target_fps = target_fps
         self.source.start_trigger(target_fps)
         
         self.video_widget.set_playing(True)
@@ -561,12 +711,14 @@ class TensorRTWindow(QMainWindow):
         try:
             if self.source_type == 'camera':
                 if self.source and isinstance(self.source, CameraController):
-                    self.source.signals.frame_ready.connect(self._on_frame_ready)
+                    self._connect_source()
                 else:
                     self.source = CameraController()
                     self.source.initialize()
-                    self.source.signals.frame_ready.connect(self._on_frame_ready)
+                    self._connect_source()
                     self._setup_camera_controls()
+                throughput = self.camera_widget.throughput_check.isChecked()
+                self.inference_worker.set_max_batch(InferenceWorker.THROUGHPUT_MAX_BATCH if throughput else 1)
             else:
                 video_path = self.video_combo.currentData()
                 if not video_path:
@@ -574,18 +726,39 @@ class TensorRTWindow(QMainWindow):
                     return False
                 
                 self.source = VideoFileController(video_path)
+                self.source.batch_size = self.video_widget.batch_spinbox.value()
+                self.inference_worker.set_max_batch(1)  # 비디오 배치는 소스에서 묶어서 제출
                 self.source.initialize()
-                self.source.signals.frame_ready.connect(self._on_frame_ready)
-                self.source.signals.progress_updated.connect(self._on_progress_updated)
+                self._connect_source()
                 # 비디오 정보 전달
                 self.video_widget.set_video_info(self.source.total_frames, self.source.video_fps)
             
             return True
         except Exception as e:
+            self._disconnect_source()  # 실패 전에 연결된 핸들 정리 (다음 시작 시 중복 연결 방지)
             print(f"❌ 소스 초기화 실패: {e}")
             self.status_label.setText(f"초기화 실패: {e}")
             return False
     
+    def _connect_source(self):
+        """
+        소스 시그널 연결 (연결 핸들을 보관해 중지 시 예외 처리 없이 해제)
+        frame_ready는 DirectConnection: 슬롯(_on_frame_ready)은 소스 스레드에서 실행되므로
+        is_running 확인과 워커 큐 제출(QMutex 보호)만 하고 위젯에는 접근하지 않음
+        """
+        signals = self.source.signals
+        self._source_connections.append(
+            signals.frame_ready.connect(self._on_frame_ready, Qt.DirectConnection))
+        if self.source_type == 'file':
+            self._source_connections.append(
+                signals.progress_updated.connect(self._on_progress_updated))
+    
+    def _disconnect_source(self):
+        """보관한 소스 시그널 연결 해제"""
+        for connection in self._source_connections:
+            QObject.disconnect(connection)
+        self._source_connections.clear()
+    
     def _on_stop(self):
         """중지 (완전 정지, 소스 해제)"""
         if not self.source:
@@ -595,18 +768,10 @@ class TensorRTWindow(QMainWindow):
         
         self.is_running = False
         self.is_paused = False
+        self.inference_engine.smooth_upscale = False
         self.source.is_running = False
         
-        try:
-            self.source.signals.frame_ready.disconnect(self._on_frame_ready)
-        except:
-            pass
-        
-        try:
-            if self.source_type == 'file':
-                self.source.signals.progress_updated.disconnect(self._on_progress_updated)
-        except:
-            pass
+        self._disconnect_source()
         
         self.source.stop_trigger()
         
@@ -619,6 +784,8 @@ class TensorRTWindow(QMainWindow):
             self.video_widget.set_playing(False)
             self.video_widget.set_controls_enabled(False)
         
+        self._pending_result = None
+        self._latest_stats = None
         self.video_label.clear()
         self.status_label.setText("중지됨")
         if was_running:
@@ -628,7 +795,10 @@ class TensorRTWindow(QMainWindow):
     def resizeEvent(self, event):
         """윈도우 크기 변경"""
         super().resizeEvent(event)
-        self._pixmap_cache = None
+        
+        # 추론 결과를 레이블 크기로 리사이즈하도록 엔진에 전달
+        label_size = self.video_label.size()
+        self.inference_engine.display_size = (label_size.width(), label_size.height())
     
     def closeEvent(self, event):
         """윈도우 종료"""
@@ -2,7 +2,7 @@
 """
 카메라 제어 위젯
 """
-from PySide6.QtWidgets import QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QGroupBox
+from PySide6.QtWidgets import QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QGroupBox, QCheckBox
 from PySide6.QtCore import Qt, Signal
 
 
@@ -12,6 +12,7 @@ class CameraControlWidget(QGroupBox):
     # 시그널
     start_camera = Signal()
     stop_camera = Signal()
+    throughput_changed = Signal(bool)  # 처리량 우선 (다중 프레임 배치) 여부
     
     def __init__(self, parent=None):
         super().__init__("카메라 제어", parent)
@@ -38,6 +39,13 @@ class CameraControlWidget(QGroupBox):
         
         layout.addLayout(btn_layout)
         
+        # 처리량 우선 모드 (지연 1프레임 증가)
+        self.throughput_check = QCheckBox("처리량 우선 (배치 추론)")
+        self.throughput_check.setToolTip("추론 중 쌓인 프레임(최대 4장)을 한 번에 추론 - 추론이 느릴수록 배치가 커짐 "
+                                         "(지연 증가, TensorRT는 dynamic batch 엔진 필요)")
+        self.throughput_check.toggled.connect(self.throughput_changed.emit)
+        layout.addWidget(self.throughput_check)
+        
         # 상태 표시
         self.status_label = QLabel("대기 중")
         self.status_label.setAlignment(Qt.AlignCenter)
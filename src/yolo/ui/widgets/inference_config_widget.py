@@ -149,6 +149,11 @@ class InferenceConfigWidget(QGroupBox):
             self.augment_check.setChecked(self.config.augment)
             self.augment_check.toggled.connect(self._on_augment_changed)
             layout.addWidget(self.augment_check)
+            
+            self.half_check = QCheckBox("FP16 (Half Precision)")
+            self.half_check.setChecked(self.config.half)
+            self.half_check.toggled.connect(self._on_half_changed)
+            layout.addWidget(self.half_check)
         
         container.setLayout(layout)
         return container
@@ -185,4 +190,10 @@ class InferenceConfigWidget(QGroupBox):
         if self.is_pt:
             self.config.augment = checked
             self.config_changed.emit(self.config)
+    
+    def _on_half_changed(self, checked):
+        """FP16 변경 (PT 전용)"""
+        if self.is_pt:
+            self.config.half = checked
+            self.config_changed.emit(self.config)
 
@@ -17,6 +17,7 @@ class VideoControlWidget(QGroupBox):
     step_frame = Signal(int)  # delta (-1 또는 +1)
     seek_requested = Signal(int)  # frame_number
     fps_changed = Signal(int)
+    batch_changed = Signal(int)  # 배치 크기
     loop_changed = Signal(bool)
     
     def __init__(self, video_files=None, parent=None):
@@ -86,6 +87,15 @@ class VideoControlWidget(QGroupBox):
         self.fps_spinbox.valueChanged.connect(self.fps_changed.emit)
         control_layout.addWidget(self.fps_spinbox)
         
+        control_layout.addWidget(QLabel("배치:"))
+        self.batch_spinbox = QSpinBox()
+        self.batch_spinbox.setMinimum(1)
+        self.batch_spinbox.setMaximum(8)
+        self.batch_spinbox.setValue(1)
+        self.batch_spinbox.setToolTip("연속 프레임을 한 번의 forward로 추론 (TensorRT는 dynamic batch 엔진 필요)")
+        self.batch_spinbox.valueChanged.connect(self.batch_changed.emit)
+        control_layout.addWidget(self.batch_spinbox)
+        
         self.loop_checkbox = QCheckBox("루프")
         self.loop_checkbox.setChecked(True)
         self.loop_checkbox.toggled.connect(self.loop_changed.emit)
@@ -46,10 +46,10 @@ class VisualPromptWidget(QGroupBox):
             self.info_label.setText("❌ train/images 폴더 없음")
             return
         
-        extensions = ['.jpg', '.jpeg', '.png', '.bmp']
-        image_files = []
-        for ext in extensions:
-            image_files.extend(self.train_images_dir.glob(f"*{ext}"))
+        # 디렉토리 1회 순회 + 확장자 집합 검사 (확장자별 glob 반복 제거)
+        extensions = {'.jpg', '.jpeg', '.png', '.bmp'}
+        image_files = [p for p in self.train_images_dir.iterdir()
+                       if p.is_file() and p.suffix.lower() in extensions]
         
         if not image_files:
             self.info_label.setText("❌ 이미지 없음")